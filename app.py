@@ -1,14 +1,29 @@
-import logging
 import os
-from flask import Flask, request, jsonify
-from threading import Thread
+
+# Cooperative I/O: gevent must patch the stdlib before anything else imports it
+USE_GEVENT = os.getenv('USE_GEVENT', 'False').lower() == 'true'
+if USE_GEVENT:
+    from gevent import monkey
+    monkey.patch_all()
+    import gevent
+
+import atexit
+import logging
+import re
+import string
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
+from threading import Lock, Timer
 import time
+import orjson
 from dotenv import load_dotenv
 
 from config.settings import Config
-from models.conversation import SessionManager
+from models.conversation import ConversationState, SessionManager, RedisSessionManager, SessionBusyError
 from services.whatsapp_service import WhatsAppService, MockWhatsAppService
-from services.llm_dialogue_manager import LLMDialogueManager
+from services.ticket_parser_service import TicketParserService
 from models.ticket_storage import ticket_storage
 
 # Configure logging
@@ -18,11 +33,65 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Greetings that trigger the welcome message for new sessions
+GREETING_RE = re.compile(r'^\s*(?:hi|hello|hey|start)\s*$', re.IGNORECASE)
+
+# Page served by GET /test; only the status values change per request
+TEST_PAGE_TEMPLATE = string.Template("""
+    <h1>🛫 Flight Booking Chatbot Test - Google Gemini Powered</h1>
+    <h2>Test the chatbot by sending a POST request to /test with message data</h2>
+    
+    <h3>Example:</h3>
+    <pre>
+    curl -X POST http://localhost:5001/test \\
+         -H "Content-Type: application/json" \\
+         -d '{"phone_number": "+1234567890", "message": "I want to go to Dubai tomorrow"}'
+    </pre>
+    
+    <h3>Current Status:</h3>
+    <ul>
+        <li><strong>Active Sessions:</strong> $active_sessions</li>
+        <li><strong>Environment:</strong> $environment</li>
+        <li><strong>WhatsApp Service:</strong> $service</li>
+        <li><strong>AI Engine:</strong> Google Gemini-Powered Natural Language Understanding</li>
+    </ul>
+    
+    <h3>Test Natural Language Examples:</h3>
+    <ol>
+        <li>Send: "I want to go to Dubai tomorrow"</li>
+        <li>Send: "Book me a flight from Delhi to Mumbai"</li>
+        <li>Send: "I need tickets for 2 people to London"</li>
+        <li>Send: "Flying to Singapore next week"</li>
+        <li>Send: "Hello" (to see how it handles non-booking messages)</li>
+    </ol>
+    """)
+
+def _json_default(obj):
+    """Serialize booking objects (flights, passengers) stored in session data"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    return str(obj)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (native datetime support, C speed)"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_json_default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Initialize services
-session_manager = SessionManager()
+# Sessions live in Redis when configured so every worker process shares them
+if Config.REDIS_URL:
+    session_manager = RedisSessionManager(Config.REDIS_URL, Config.SESSION_TIMEOUT)
+    logger.info("🗄️ Using Redis session store")
+else:
+    session_manager = SessionManager(Config.SESSION_TIMEOUT_MINUTES)
 
 # Use MockWhatsAppService for testing, real WhatsAppService for production
 if Config.FLASK_ENV == 'development' or Config.WHATSAPP_TOKEN == 'your_whatsapp_token_here':
@@ -32,19 +101,39 @@ else:
     whatsapp_service = WhatsAppService()
     logger.info("📱 Using Real WhatsApp Service")
 
-# Use LLM-powered dialogue manager
-dialogue_manager = LLMDialogueManager(whatsapp_service)
-logger.info("🧠 Using Google Gemini-powered Dialogue Manager")
+IS_MOCK_WHATSAPP = isinstance(whatsapp_service, MockWhatsAppService)
+WHATSAPP_SERVICE_LABEL = 'Mock' if IS_MOCK_WHATSAPP else 'Real'
+
+def create_dialogue_manager(whatsapp_service):
+    """Build the configured dialogue manager, importing only the one in use"""
+    if Config.DIALOGUE_MODE == 'rules':
+        from services.dialogue_manager import DialogueManager
+        logger.info("📏 Using rule-based Dialogue Manager")
+        return DialogueManager(whatsapp_service)
+    
+    from services.llm_dialogue_manager import LLMDialogueManager
+    logger.info("🧠 Using Google Gemini-powered Dialogue Manager")
+    return LLMDialogueManager(whatsapp_service)
+
+dialogue_manager = create_dialogue_manager(whatsapp_service)
+
+# Shared ticket parser so the Gemini client is configured once, not per upload.
+# PDF text extraction is CPU-bound, so it runs in separate processes, started lazily
+# in each worker process on the first upload
+ticket_parser = TicketParserService(pdf_workers=Config.PDF_WORKER_PROCESSES)
+
+# Static part of the health check body, encoded once; only the count is appended per probe
+HEALTH_BODY_PREFIX = orjson.dumps({
+    'status': 'healthy',
+    'service': 'Flight Booking Chatbot',
+    'version': '2.0 - Google Gemini Powered'
+})[:-1] + b', "active_sessions": '
 
 @app.route('/')
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'healthy',
-        'service': 'Flight Booking Chatbot',
-        'version': '2.0 - Google Gemini Powered',
-        'active_sessions': session_manager.get_active_sessions_count()
-    })
+    active_sessions = session_manager.get_active_sessions_count()
+    return Response(HEALTH_BODY_PREFIX + b'%d}' % active_sessions, mimetype='application/json')
 
 @app.route('/webhook', methods=['GET'])
 def verify_webhook():
@@ -53,7 +142,7 @@ def verify_webhook():
     token = request.args.get('hub.verify_token')
     challenge = request.args.get('hub.challenge')
     
-    logger.info(f"Webhook verification attempt: mode={mode}, token={token}")
+    logger.info("Webhook verification attempt: mode=%s, token=%s", mode, token)
     
     verification_result = whatsapp_service.verify_webhook(mode, token, challenge)
     
@@ -64,12 +153,56 @@ def verify_webhook():
         logger.warning("❌ Webhook verification failed")
         return 'Verification failed', 403
 
+# Bounded worker pool for webhook processing (threads are reused, not spawned per message)
+executor = None
+if not USE_GEVENT:
+    executor = ThreadPoolExecutor(max_workers=Config.WORKER_THREADS, thread_name_prefix='webhook')
+    atexit.register(executor.shutdown, wait=False)
+
+_pending_lock = Lock()
+_pending_tasks = 0
+_last_backlog_warning = 0.0
+
+def _run_tracked(target, *args):
+    """Run a background task and release its slot in the pending count"""
+    global _pending_tasks
+    try:
+        target(*args)
+    finally:
+        with _pending_lock:
+            _pending_tasks -= 1
+
+def dispatch_background(target, *args) -> bool:
+    """Run a webhook task outside the request/response cycle.
+
+    All background work goes through this single entry point so the
+    concurrency backend can be changed without touching the handlers.
+    Returns False when the backlog is full and the task was rejected.
+    """
+    global _pending_tasks, _last_backlog_warning
+    with _pending_lock:
+        if _pending_tasks >= Config.MAX_PENDING_MESSAGES:
+            # Log at most once every 5 seconds while the backlog stays full
+            now = time.monotonic()
+            if now - _last_backlog_warning > 5:
+                _last_backlog_warning = now
+                logger.warning("⚠️ Webhook backlog full (%s pending), rejecting new messages", _pending_tasks)
+            return False
+        _pending_tasks += 1
+    
+    if USE_GEVENT:
+        gevent.spawn(_run_tracked, target, *args)
+    else:
+        executor.submit(_run_tracked, target, *args)
+    return True
+
 @app.route('/webhook', methods=['POST'])
 def handle_webhook():
     """Handle incoming WhatsApp messages"""
     try:
-        webhook_data = request.get_json()
-        logger.info(f"📨 Received webhook: {webhook_data}")
+        webhook_data = orjson.loads(request.get_data())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📨 Received webhook: %s", webhook_data)
         
         # Extract message data
         message_data = whatsapp_service.extract_message_from_webhook(webhook_data)
@@ -83,20 +216,40 @@ def handle_webhook():
         message_type = message_data['type']
         contact_name = message_data.get('contact_name', '')
         
-        logger.info(f"📞 Message from {phone_number}: {message_text} (Type: {message_type})")
+        logger.info("📞 Message from %s: %s (Type: %s)", phone_number, message_text, message_type)
         
-        # Process message in separate thread to avoid timeout
-        thread = Thread(target=process_message_async, args=(phone_number, message_text, contact_name, message_type, message_data))
-        thread.start()
+        # Process message in the background to avoid webhook timeout
+        if not dispatch_background(process_message_async, phone_number, message_text, contact_name, message_type, message_data):
+            # WhatsApp retries failed deliveries, so shed load instead of queueing forever
+            return jsonify({'status': 'busy'}), 429
         
         return jsonify({'status': 'ok'})
         
     except Exception as e:
-        logger.error(f"❌ Error handling webhook: {e}")
+        logger.error("❌ Error handling webhook: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-def process_message_async(phone_number: str, message_text: str, contact_name: str = '', message_type: str = 'text', message_data: dict = {}):
-    """Process message asynchronously"""
+def process_message_async(phone_number: str, message_text: str, contact_name: str = '', message_type: str = 'text', message_data: dict = {}, attempt: int = 0):
+    """Process message asynchronously, one message per user at a time"""
+    try:
+        # Held from loading the session to saving it, so two messages from the same
+        # user cannot overwrite each other's state in a shared (Redis) store
+        with session_manager.session_lock(phone_number):
+            _process_message(phone_number, message_text, contact_name, message_type, message_data)
+    except SessionBusyError:
+        # An earlier message from this user is still running; go back in the queue
+        # instead of holding this worker, and tell the user if it stays busy
+        if attempt < Config.SESSION_LOCK_RETRIES and dispatch_background(
+                process_message_async, phone_number, message_text, contact_name, message_type, message_data, attempt + 1):
+            logger.info("⏳ Session for %s is busy, message requeued", phone_number)
+        else:
+            logger.warning("⚠️ Session for %s stayed busy, asking the user to resend", phone_number)
+            whatsapp_service.send_error_message(phone_number, 'session_busy')
+    except Exception as e:
+        logger.error("❌ Could not lock session for %s: %s", phone_number, e)
+
+def _process_message(phone_number: str, message_text: str, contact_name: str, message_type: str, message_data: dict):
+    session = None
     try:
         # Get or create session
         session = session_manager.get_session(phone_number)
@@ -107,9 +260,9 @@ def process_message_async(phone_number: str, message_text: str, contact_name: st
             return
         
         # Handle welcome message for new sessions with simple greetings
-        if (session.state.value == 'greeting' and 
+        if (session.state == ConversationState.GREETING and 
             session.get_context('last_message') is None and
-            message_text.lower().strip() in ['hi', 'hello', 'hey', 'start']):
+            GREETING_RE.match(message_text)):
             # Set context to prevent welcome message loop
             session.set_context('last_message', message_text)
             whatsapp_service.send_welcome_message(phone_number, contact_name)
@@ -122,13 +275,17 @@ def process_message_async(phone_number: str, message_text: str, contact_name: st
         if response:
             whatsapp_service.send_text_message(phone_number, response)
         
-        logger.info(f"✅ Message processed for {phone_number}")
+        logger.info("✅ Message processed for %s", phone_number)
         
     except Exception as e:
-        logger.error(f"❌ Error processing message for {phone_number}: {e}")
+        logger.error("❌ Error processing message for %s: %s", phone_number, e)
+    finally:
+        if session is not None:
+            session_manager.save_session(session)
 
 def handle_pdf_upload(phone_number: str, message_data: dict, session):
     """Handle PDF ticket upload and processing"""
+    processing_notice = None
     try:
         document_info = message_data.get('document', {})
         
@@ -136,34 +293,36 @@ def handle_pdf_upload(phone_number: str, message_data: dict, session):
             whatsapp_service.send_error_message(phone_number, 'invalid_pdf')
             return
         
-        # Send processing message
-        whatsapp_service.send_pdf_processing_message(phone_number)
-        
-        # Download PDF file
         media_id = document_info.get('id')
         if not media_id:
             whatsapp_service.send_error_message(phone_number, 'pdf_parsing_failed')
             return
         
-        pdf_content = whatsapp_service.download_media_file(media_id)
-        if not pdf_content:
-            whatsapp_service.send_error_message(phone_number, 'pdf_parsing_failed')
-            return
-        
-        # Parse ticket using LLM
-        from services.ticket_parser_service import TicketParserService
-        ticket_parser = TicketParserService()
-        
-        # Validate PDF
-        if not ticket_parser.validate_pdf_file(pdf_content):
-            whatsapp_service.send_error_message(phone_number, 'invalid_pdf')
-            return
-        
-        # Parse ticket details
-        ticket_info = ticket_parser.parse_flight_ticket(pdf_content)
+        # Send processing message while the PDF downloads and parses
+        processing_notice = whatsapp_service.send_in_background(
+            whatsapp_service.send_pdf_processing_message, phone_number
+        )
         
-        if not ticket_info.get('success'):
-            whatsapp_service.send_error_message(phone_number, 'pdf_parsing_failed')
+        # Download, validate and parse, holding any error until the notice is out
+        error_type = None
+        pdf_file = whatsapp_service.download_media_file(media_id)
+        if pdf_file is None:
+            error_type = 'pdf_parsing_failed'
+        else:
+            with pdf_file:
+                # Validate PDF
+                if not ticket_parser.validate_pdf_file(pdf_file):
+                    error_type = 'invalid_pdf'
+                else:
+                    # Parse ticket details
+                    ticket_info = ticket_parser.parse_flight_ticket(pdf_file)
+                    if not ticket_info.get('success'):
+                        error_type = 'pdf_parsing_failed'
+        
+        if error_type:
+            # Keep the notice ahead of the error reply
+            processing_notice.result()
+            whatsapp_service.send_error_message(phone_number, error_type)
             return
         
         # Extract flight details for price comparison
@@ -185,24 +344,28 @@ def handle_pdf_upload(phone_number: str, message_data: dict, session):
         
         # Format and send response
         response = ticket_parser.format_ticket_analysis_for_whatsapp(ticket_info, price_comparison)
+        # Keep the notice ahead of the analysis
+        processing_notice.result()
         whatsapp_service.send_text_message(phone_number, response)
         
         # 🆕 ENHANCED: Set new ticket data atomically
         session.set_context('parsed_ticket', ticket_info)
         session.set_context('price_comparison', price_comparison)
         
-        # 🆕 ENHANCED: Store in persistent storage with clear operation
-        ticket_storage.clear_ticket_data(phone_number)  # Clear old data first
+        # 🆕 ENHANCED: Store in persistent storage (replaces old data in one atomic write)
         ticket_storage.store_ticket_data(
             phone_number=phone_number,
             ticket_info=ticket_info,
             price_comparison=price_comparison
         )
         
-        logger.info(f"✅ PDF ticket processed and stored for {phone_number}")
+        logger.info("✅ PDF ticket processed and stored for %s", phone_number)
         
     except Exception as e:
-        logger.error(f"❌ Error processing PDF upload for {phone_number}: {e}")
+        logger.error("❌ Error processing PDF upload for %s: %s", phone_number, e)
+        if processing_notice is not None:
+            # Keep the notice ahead of the error reply (wait() never re-raises its errors)
+            wait([processing_notice])
         # Clear any partial data on error
         session.set_context('parsed_ticket', None)
         session.set_context('price_comparison', None)
@@ -212,34 +375,11 @@ def handle_pdf_upload(phone_number: str, message_data: dict, session):
 @app.route('/test', methods=['GET'])
 def test_endpoint():
     """Test endpoint for manual testing"""
-    return """
-    <h1>🛫 Flight Booking Chatbot Test - Google Gemini Powered</h1>
-    <h2>Test the chatbot by sending a POST request to /test with message data</h2>
-    
-    <h3>Example:</h3>
-    <pre>
-    curl -X POST http://localhost:5001/test \\
-         -H "Content-Type: application/json" \\
-         -d '{"phone_number": "+1234567890", "message": "I want to go to Dubai tomorrow"}'
-    </pre>
-    
-    <h3>Current Status:</h3>
-    <ul>
-        <li><strong>Active Sessions:</strong> """ + str(session_manager.get_active_sessions_count()) + """</li>
-        <li><strong>Environment:</strong> """ + Config.FLASK_ENV + """</li>
-        <li><strong>WhatsApp Service:</strong> """ + ("Mock" if isinstance(whatsapp_service, MockWhatsAppService) else "Real") + """</li>
-        <li><strong>AI Engine:</strong> Google Gemini-Powered Natural Language Understanding</li>
-    </ul>
-    
-    <h3>Test Natural Language Examples:</h3>
-    <ol>
-        <li>Send: "I want to go to Dubai tomorrow"</li>
-        <li>Send: "Book me a flight from Delhi to Mumbai"</li>
-        <li>Send: "I need tickets for 2 people to London"</li>
-        <li>Send: "Flying to Singapore next week"</li>
-        <li>Send: "Hello" (to see how it handles non-booking messages)</li>
-    </ol>
-    """
+    return TEST_PAGE_TEMPLATE.substitute(
+        active_sessions=session_manager.get_active_sessions_count(),
+        environment=Config.FLASK_ENV,
+        service=WHATSAPP_SERVICE_LABEL
+    )
 
 @app.route('/test', methods=['POST'])
 def test_message():
@@ -252,14 +392,16 @@ def test_message():
         if not message_text:
             return jsonify({'error': 'Message is required'}), 400
         
-        logger.info(f"🧪 Test message from {phone_number}: {message_text}")
+        logger.info("🧪 Test message from %s: %s", phone_number, message_text)
         
         # Process message
-        session = session_manager.get_session(phone_number)
-        response = dialogue_manager.process_message(session, message_text)
+        with session_manager.session_lock(phone_number):
+            session = session_manager.get_session(phone_number)
+            response = dialogue_manager.process_message(session, message_text)
+            session_manager.save_session(session)
         
         # For mock service, also send the response
-        if isinstance(whatsapp_service, MockWhatsAppService):
+        if IS_MOCK_WHATSAPP:
             whatsapp_service.send_text_message(phone_number, response)
         
         return jsonify({
@@ -267,43 +409,44 @@ def test_message():
             'phone_number': phone_number,
             'message': message_text,
             'response': response,
-            'session_state': session.state.value,
+            'session_state': session.state.label,
             'session_data': session.data
         })
         
     except Exception as e:
-        logger.error(f"❌ Error in test endpoint: {e}")
+        logger.error("❌ Error in test endpoint: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @app.route('/sessions', methods=['GET'])
 def get_sessions():
     """Get information about active sessions"""
-    try:
-        sessions_info = []
-        for phone_number, session in session_manager.sessions.items():
-            sessions_info.append({
-                'phone_number': phone_number,
-                'state': session.state.value,
-                'created_at': session.created_at.isoformat(),
-                'last_activity': session.last_activity.isoformat(),
-                'data': session.data
-            })
-        
-        return jsonify({
-            'active_sessions': len(sessions_info),
-            'sessions': sessions_info
-        })
-        
-    except Exception as e:
-        logger.error(f"❌ Error getting sessions: {e}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+    def generate():
+        # Rows are written one at a time so memory stays flat however many sessions exist
+        count = 0
+        yield '{"sessions": ['
+        try:
+            for phone_number, session in session_manager.iter_sessions():
+                row = orjson.dumps({
+                    'phone_number': phone_number,
+                    'state': session.state.label,
+                    'created_at': session.created_at,
+                    'last_activity': session.last_activity_at,
+                    'data': session.data
+                }, default=_json_default).decode()
+                yield row if count == 0 else ', ' + row
+                count += 1
+        except Exception as e:
+            logger.error("❌ Error getting sessions: %s", e)
+        yield f'], "active_sessions": {count}}}'
+    
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/sessions/<phone_number>', methods=['DELETE'])
 def reset_session(phone_number: str):
     """Reset a specific session"""
     try:
         session_manager.reset_session(phone_number)
-        logger.info(f"🔄 Session reset for {phone_number}")
+        logger.info("🔄 Session reset for %s", phone_number)
         
         return jsonify({
             'status': 'success',
@@ -311,32 +454,55 @@ def reset_session(phone_number: str):
         })
         
     except Exception as e:
-        logger.error(f"❌ Error resetting session: {e}")
+        logger.error("❌ Error resetting session: %s", e)
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+def schedule_cleanup(interval, cleanup):
+    """Schedule the next cleanup pass without keeping a thread asleep in between"""
+    if USE_GEVENT:
+        gevent.spawn_later(interval, cleanup)
+    else:
+        timer = Timer(interval, cleanup)
+        timer.daemon = True
+        timer.start()
+
 def cleanup_sessions():
-    """Background task to cleanup expired sessions"""
-    while True:
-        try:
-            time.sleep(300)  # Run every 5 minutes
-            session_manager.cleanup_expired_sessions(Config.SESSION_TIMEOUT // 60)
-            logger.debug("🧹 Session cleanup completed")
-        except Exception as e:
-            logger.error(f"❌ Error in session cleanup: {e}")
+    """Run one session cleanup pass and reschedule the next one"""
+    try:
+        session_manager.cleanup_expired_sessions()
+        logger.debug("🧹 Session cleanup completed")
+    except Exception as e:
+        logger.error("❌ Error in session cleanup: %s", e)
+    finally:
+        schedule_cleanup(Config.SESSION_CLEANUP_INTERVAL, cleanup_sessions)
+
+def cleanup_tickets():
+    """Delete expired stored tickets off the request path and reschedule the next sweep"""
+    try:
+        ticket_storage.cleanup_expired_tickets()
+    finally:
+        schedule_cleanup(Config.TICKET_CLEANUP_INTERVAL, cleanup_tickets)
+
+def start_background_cleanup():
+    """Start the periodic session and ticket cleanup in the background"""
+    if session_manager.requires_cleanup:
+        schedule_cleanup(Config.SESSION_CLEANUP_INTERVAL, cleanup_sessions)
+    schedule_cleanup(Config.TICKET_CLEANUP_INTERVAL, cleanup_tickets)
 
 if __name__ == '__main__':
-    # Start session cleanup in background
-    cleanup_thread = Thread(target=cleanup_sessions, daemon=True)
-    cleanup_thread.start()
+    if Config.FLASK_ENV != 'development':
+        logger.error("❌ The built-in server is for development only, use: gunicorn -c gunicorn.conf.py wsgi:application")
+        sys.exit(1)
     
-    logger.info(f"🚀 Starting Flight Booking Chatbot on port {Config.PORT}")
-    logger.info(f"🔧 Environment: {Config.FLASK_ENV}")
-    logger.info(f"📱 WhatsApp Service: {'Mock' if isinstance(whatsapp_service, MockWhatsAppService) else 'Real'}")
+    # Start session and ticket cleanup in background
+    start_background_cleanup()
     
-    if Config.FLASK_ENV == 'development':
-        logger.info("💡 For testing, visit: http://localhost:5001/test")
-        logger.info("💡 To test with curl:")
-        logger.info("   curl -X POST http://localhost:5001/test -H 'Content-Type: application/json' -d '{\"phone_number\": \"+1234567890\", \"message\": \"I want to book a flight\"}'")
+    logger.info("🚀 Starting Flight Booking Chatbot on port %s", Config.PORT)
+    logger.info("🔧 Environment: %s", Config.FLASK_ENV)
+    logger.info("📱 WhatsApp Service: %s", WHATSAPP_SERVICE_LABEL)
+    logger.info("💡 For testing, visit: http://localhost:5001/test")
+    logger.info("💡 To test with curl:")
+    logger.info("   curl -X POST http://localhost:5001/test -H 'Content-Type: application/json' -d '{\"phone_number\": \"+1234567890\", \"message\": \"I want to book a flight\"}'")
     
     app.run(
         host='0.0.0.0',
@@ -8,6 +8,7 @@ class Config:
     WHATSAPP_TOKEN = os.getenv('WHATSAPP_TOKEN', 'your_whatsapp_token_here')
     WHATSAPP_PHONE_NUMBER_ID = os.getenv('WHATSAPP_PHONE_NUMBER_ID', 'your_phone_number_id')
     WHATSAPP_VERIFY_TOKEN = os.getenv('WHATSAPP_VERIFY_TOKEN', 'flight_booking_verify_token')
+    WHATSAPP_API_URL = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
     
     # Google AI Configuration
     GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', 'your_google_api_key_here')
@@ -17,8 +18,40 @@ class Config:
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
     PORT = int(os.getenv('PORT', 5000))
     
+    # Outbound HTTP Configuration (connect, read) timeouts in seconds
+    HTTP_TIMEOUT = (3.05, 10)
+    MEDIA_HTTP_TIMEOUT = (3.05, 30)
+    HTTP_POOL_CONNECTIONS = 10
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 50))
+    SEND_WORKER_THREADS = 4  # Concurrent outbound sends per WhatsApp service
+    MEDIA_SPOOL_MAX_SIZE = 2 * 1024 * 1024  # Larger downloads spill to disk
+    
+    # Webhook Worker Configuration
+    WORKER_THREADS = int(os.getenv('WORKER_THREADS', 32))
+    MAX_PENDING_MESSAGES = int(os.getenv('MAX_PENDING_MESSAGES', 1000))
+    
+    # PDF Parsing Configuration (0 processes parses in the webhook worker)
+    PDF_WORKER_PROCESSES = int(os.getenv('PDF_WORKER_PROCESSES', 2))
+    PDF_PARSE_TIMEOUT = 30
+    
+    # Dialogue Configuration: 'llm' (Gemini) or 'rules' (pattern matching)
+    DIALOGUE_MODE = os.getenv('DIALOGUE_MODE', 'llm').lower()
+    
+    # LLM Configuration
+    LLM_CACHE_SIZE = int(os.getenv('LLM_CACHE_SIZE', 4096))
+    LLM_CACHE_MAX_MESSAGE_LENGTH = 64  # Only short, frequently repeated messages are cached
+    
+    # Flight Search Configuration
+    FLIGHT_SEARCH_CACHE_SIZE = int(os.getenv('FLIGHT_SEARCH_CACHE_SIZE', 1024))
+    FLIGHT_SEARCH_CACHE_TTL = 60  # Seconds a search result is reused
+    
     # Session Configuration
     SESSION_TIMEOUT = 1800  # 30 minutes
+    SESSION_TIMEOUT_MINUTES = SESSION_TIMEOUT // 60
+    SESSION_CLEANUP_INTERVAL = 60  # Seconds between expired-session sweeps
+    TICKET_CLEANUP_INTERVAL = 3600  # Seconds between expired-ticket sweeps
+    REDIS_URL = os.getenv('REDIS_URL', '')  # Shared session store (in-memory when empty)
+    SESSION_LOCK_RETRIES = 2  # Requeues of a message whose session another worker holds
     
     # Mock Data Configuration
     MOCK_API_DELAY = 1  # Simulate API response delay
@@ -28,4 +61,4 @@ class Config:
     
     @staticmethod
     def get_whatsapp_api_url():
-        return f"https://graph.facebook.com/v18.0/{Config.WHATSAPP_PHONE_NUMBER_ID}/messages" 
\ No newline at end of file
+        return Config.WHATSAPP_API_URL 
\ No newline at end of file
@@ -49,7 +49,10 @@ def convert_html_to_pdf():
     print("-" * 40)
     print("Option 1: Use Chrome headless")
     print("chrome --headless --disable-gpu --print-to-pdf=diagrams.pdf flight_booking_diagrams.html")
-    print("\nOption 2: Install wkhtmltopdf")
+    print("\nOption 2: Use WeasyPrint (in-process, no browser needed)")
+    print("pip install weasyprint")
+    print("Then run: python convert_to_pdf.py --weasyprint")
+    print("\nOption 3: Install wkhtmltopdf")
     print("pip install pdfkit")
     print("Then use: pdfkit.from_file('flight_booking_diagrams.html', 'diagrams.pdf')")
     
@@ -62,9 +65,9 @@ def install_pdf_dependencies():
     try:
         import subprocess
         
-        # Try to install pdfkit and wkhtmltopdf
-        subprocess.run([sys.executable, "-m", "pip", "install", "pdfkit"], check=True)
-        print("✅ pdfkit installed successfully")
+        # Try to install weasyprint, pdfkit and wkhtmltopdf
+        subprocess.run([sys.executable, "-m", "pip", "install", "weasyprint", "pdfkit"], check=True)
+        print("✅ weasyprint and pdfkit installed successfully")
         
         print("\n📦 Additional requirement:")
         print("You need to install wkhtmltopdf:")
@@ -108,16 +111,47 @@ def convert_with_pdfkit():
         print(f"❌ Error generating PDF: {e}")
         return False
 
+def convert_with_weasyprint(html_files=None):
+    """Convert one or more HTML files in-process using WeasyPrint"""
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        print("❌ weasyprint not installed. Run with --install flag first.")
+        return False
+    
+    # Everything renders in this process, so batches pay no per-file startup cost
+    html_files = html_files or ['flight_booking_diagrams.html']
+    success = True
+    
+    for html_file in html_files:
+        if not os.path.exists(html_file):
+            print(f"❌ HTML file '{html_file}' not found!")
+            success = False
+            continue
+        
+        pdf_file = str(Path(html_file).with_suffix('.pdf'))
+        try:
+            HTML(filename=html_file).write_pdf(pdf_file, presentational_hints=True)
+            print(f"✅ PDF generated successfully: {pdf_file}")
+        except Exception as e:
+            print(f"❌ Error generating PDF for {html_file}: {e}")
+            success = False
+    
+    return success
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         if sys.argv[1] == "--install":
             install_pdf_dependencies()
+        elif sys.argv[1] == "--weasyprint":
+            convert_with_weasyprint(sys.argv[2:])
         elif sys.argv[1] == "--pdfkit":
             convert_with_pdfkit()
         elif sys.argv[1] == "--help":
             print("Usage:")
             print("python convert_to_pdf.py          # Open in browser for manual conversion")
             print("python convert_to_pdf.py --install  # Install PDF dependencies")
+            print("python convert_to_pdf.py --weasyprint [files...]  # Auto-convert in-process (batch capable)")
             print("python convert_to_pdf.py --pdfkit   # Auto-convert using pdfkit")
         else:
             print("Unknown option. Use --help for usage information.")
@@ -3,37 +3,61 @@
 Debug fuzzy matching in city detection
 """
 
-from services.intent_service import IntentService
-from fuzzywuzzy import fuzz, process
-import json
+import string
+from bisect import bisect_left
+from functools import lru_cache
+import numpy as np
+from services.intent_service import get_intent_service
+from rapidfuzz import fuzz, process, utils
+
+# Common booking words that should never be treated as city candidates
+STOPWORDS = frozenset({'i', 'want', 'to', 'book', 'a', 'flight', 'need', 'from',
+                       'for', 'the', 'me', 'my', 'please', 'ticket', 'on'})
+
+# Punctuation becomes whitespace so str.split() yields the same words as \b\w+\b
+PUNCTUATION_TO_SPACE = str.maketrans({c: ' ' for c in string.punctuation})
+
+# A single bit-parallel Levenshtein pass per pair; WRatio runs several sub-scorers.
+# The inputs are already normalized, so QRatio needs no preprocessing of its own.
+FUZZY_SCORER = fuzz.QRatio
+
+MIN_PREFIX_LENGTH = 3  # Shorter words ("i", "to") would prefix-match too much
+
+def prefix_matches(sorted_names, word):
+    """Trie-style lookup on a sorted list: names starting with word, then
+    names that are themselves a prefix of word"""
+    matches = []
+    index = bisect_left(sorted_names, word)
+    while index < len(sorted_names) and sorted_names[index].startswith(word):
+        matches.append(sorted_names[index])
+        index += 1
+    
+    for length in range(MIN_PREFIX_LENGTH, len(word)):
+        prefix = word[:length]
+        index = bisect_left(sorted_names, prefix)
+        if index < len(sorted_names) and sorted_names[index] == prefix:
+            matches.append(prefix)
+    return matches
+
+@lru_cache(maxsize=None)
+def build_city_index():
+    """Build the lowercased city lookup structures once per process"""
+    # Pre-lowercased (name, city_data) pairs from the shared intent service
+    city_aliases = get_intent_service().city_aliases
+    all_city_names = [name for name, _ in city_aliases]
+    city_mapping = dict(city_aliases)
+    
+    # Sorted copy for prefix lookups, pre-normalized copy for RapidFuzz (processor=None)
+    sorted_names = sorted(set(all_city_names))
+    choices = [utils.default_process(name) for name in all_city_names]
+    return all_city_names, city_mapping, sorted_names, choices
 
 def debug_fuzzy_matching():
     """Debug the fuzzy matching issue"""
     print("🔍 Debugging Fuzzy Matching")
     print("=" * 50)
     
-    intent_service = IntentService()
-    
-    # Get all city names and aliases
-    all_city_names = []
-    city_mapping = {}
-    
-    for city_key, city_data in intent_service.cities_data['cities'].items():
-        # Add main city name
-        city_name = city_data['name'].lower()
-        all_city_names.append(city_name)
-        city_mapping[city_name] = city_data
-        
-        # Add IATA code
-        iata = city_data['iata'].lower()
-        all_city_names.append(iata)
-        city_mapping[iata] = city_data
-        
-        # Add aliases
-        for alias in city_data.get('aliases', []):
-            alias_lower = alias.lower()
-            all_city_names.append(alias_lower)
-            city_mapping[alias_lower] = city_data
+    all_city_names, city_mapping, sorted_names, choices = build_city_index()
     
     print(f"Total city names/aliases: {len(all_city_names)}")
     print(f"Cities: {all_city_names}")
@@ -42,16 +66,54 @@ def debug_fuzzy_matching():
     message = "I want to book a flight"
     print(f"\n🔍 Testing message: '{message}'")
     
-    import re
-    words = re.findall(r'\b\w+\b', message.lower())
+    words = message.lower().translate(PUNCTUATION_TO_SPACE).split()
     print(f"Words in message: {words}")
     
+    # Exact and prefix hits come from the sorted index; only misses go to fuzzy matching
+    fuzzy_words = []
+    
     for word in words:
+        if word in STOPWORDS:
+            print(f"\n  Skipping stopword: '{word}'")
+            continue
+        
+        # Exact name, alias or IATA code: a dict hit, no scoring needed
+        if word in city_mapping:
+            city_data = city_mapping[word]
+            print(f"\n  Testing word: '{word}'")
+            print(f"    Exact match: '{word}' -> {city_data['name']} ({city_data['iata']}) - Score: 100")
+            continue
+        
+        if len(word) < MIN_PREFIX_LENGTH:
+            fuzzy_words.append(word)
+            continue
+        
+        matches = prefix_matches(sorted_names, word)
+        if not matches:
+            fuzzy_words.append(word)
+            continue
+        
+        print(f"\n  Testing word: '{word}'")
+        for match in matches:
+            city_data = city_mapping[match]
+            print(f"    Prefix match: '{match}' -> {city_data['name']} ({city_data['iata']})")
+    
+    if not fuzzy_words:
+        return
+    
+    # Score the remaining words against every city in a single pass
+    queries = [utils.default_process(word) for word in fuzzy_words]
+    scores = process.cdist(queries, choices, scorer=FUZZY_SCORER, score_cutoff=80,
+                           processor=None, workers=-1)
+    
+    for row, word in enumerate(fuzzy_words):
         print(f"\n  Testing word: '{word}'")
-        matches = process.extractBests(word, all_city_names, score_cutoff=80, limit=5)
-        for match, score in matches:
+        matched = np.flatnonzero(scores[row])
+        # Best 5 matches, highest score first
+        for col in matched[np.argsort(-scores[row][matched], kind='stable')][:5]:
+            match = all_city_names[col]
             city_data = city_mapping[match]
-            print(f"    Match: '{match}' -> {city_data['name']} ({city_data['iata']}) - Score: {score}")
+            print(f"    Match: '{match}' -> {city_data['name']} ({city_data['iata']}) - Score: {scores[row][col]:.0f}")
 
 if __name__ == "__main__":
     debug_fuzzy_matching() 
\ No newline at end of file
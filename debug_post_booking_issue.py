@@ -6,11 +6,49 @@ Tests various scenarios to find the inconsistency
 
 import os
 import sys
+import traceback
+from functools import lru_cache
+from types import SimpleNamespace
 from models.conversation import SessionManager, ConversationState
 from services.whatsapp_service import MockWhatsAppService
 from services.llm_dialogue_manager import LLMDialogueManager
 from models.ticket_storage import ticket_storage
 
+# Per-step details are only printed when DEBUG_FLIGHT is set
+VERBOSE = bool(os.getenv('DEBUG_FLIGHT'))
+
+# Ticket fixtures shared by every scenario
+MOCK_TICKET_INFO = {
+    'success': True,
+    'flight_details': {
+        'airline': 'Emirates',
+        'flight_number': 'EK512',
+        'origin_city': 'Delhi',
+        'origin_airport': 'DEL',
+        'destination_city': 'Dubai', 
+        'destination_airport': 'DXB',
+        'departure_date': '2024-08-30'
+    }
+}
+
+MOCK_PRICE_COMPARISON = {
+    'comparison_available': True,
+    'ticket_price': 25000,
+    'best_system_price': 14000,
+    'price_difference': 11000,
+    'recommendation': 'cheaper'
+}
+
+@lru_cache(maxsize=None)
+def _services():
+    """Build the services once; tests only reset per-phone session state"""
+    whatsapp_service = MockWhatsAppService()
+    return SimpleNamespace(
+        session_manager=SessionManager(),
+        whatsapp_service=whatsapp_service,
+        dialogue_manager=LLMDialogueManager(whatsapp_service)
+    )
+
 def test_post_booking_consistency():
     """Test post-booking question consistency"""
     print("🔍 DEBUGGING POST-BOOKING CONSISTENCY ISSUE")
@@ -18,10 +56,10 @@ def test_post_booking_consistency():
     
     phone_number = "+1234567890"
     
-    # Initialize services
-    session_manager = SessionManager()
-    whatsapp_service = MockWhatsAppService()
-    dialogue_manager = LLMDialogueManager(whatsapp_service)
+    # Shared services
+    svc = _services()
+    session_manager = svc.session_manager
+    dialogue_manager = svc.dialogue_manager
     
     # Test multiple scenarios
     scenarios = [
@@ -46,33 +84,11 @@ def test_post_booking_consistency():
         session = session_manager.get_session(phone_number)
         
         # Set up ticket data (like after PDF upload)
-        mock_ticket_info = {
-            'success': True,
-            'flight_details': {
-                'airline': 'Emirates',
-                'flight_number': 'EK512',
-                'origin_city': 'Delhi',
-                'origin_airport': 'DEL',
-                'destination_city': 'Dubai', 
-                'destination_airport': 'DXB',
-                'departure_date': '2024-08-30'
-            }
-        }
-        
-        mock_price_comparison = {
-            'comparison_available': True,
-            'ticket_price': 25000,
-            'best_system_price': 14000,
-            'price_difference': 11000,
-            'recommendation': 'cheaper'
-        }
-        
-        # Set session data
-        session.set_context('parsed_ticket', mock_ticket_info)
-        session.set_context('price_comparison', mock_price_comparison)
+        session.set_context('parsed_ticket', MOCK_TICKET_INFO)
+        session.set_context('price_comparison', MOCK_PRICE_COMPARISON)
         
         # Store persistently
-        ticket_storage.store_ticket_data(phone_number, mock_ticket_info, mock_price_comparison)
+        ticket_storage.store_ticket_data(phone_number, MOCK_TICKET_INFO, MOCK_PRICE_COMPARISON)
         
         print(f"   ✅ Ticket data set up")
         
@@ -87,30 +103,35 @@ def test_post_booking_consistency():
         has_ticket_before = bool(session.get_context('parsed_ticket'))
         has_comparison_before = bool(session.get_context('price_comparison'))
         
-        print(f"   📱 Before question - Ticket: {'✅' if has_ticket_before else '❌'}, Comparison: {'✅' if has_comparison_before else '❌'}")
+        if VERBOSE:
+            print(f"   📱 Before question - Ticket: {'✅' if has_ticket_before else '❌'}, Comparison: {'✅' if has_comparison_before else '❌'}")
         
         # Test action detection
         action = dialogue_manager._detect_ticket_action(question)
-        print(f"   🔍 Detected action: '{action}'")
+        if VERBOSE:
+            print(f"   🔍 Detected action: '{action}'")
         
         # Process the message
         response = dialogue_manager.process_message(session, question)
         
-        # Check response quality
-        is_booking_request = "which city" in response.lower() and "fly from" in response.lower()
-        has_price_info = "₹" in response and "price" in response.lower()
-        has_ticket_info = "ticket" in response.lower() or "flight" in response.lower()
+        # Check response quality (lowercase once, reuse for every check)
+        response_lower = response.lower()
+        is_booking_request = "which city" in response_lower and "fly from" in response_lower
+        has_price_info = "₹" in response and "price" in response_lower
+        has_ticket_info = "ticket" in response_lower or "flight" in response_lower
         
-        print(f"   📊 Response analysis:")
-        print(f"      Is booking request: {'❌ YES' if is_booking_request else '✅ NO'}")
-        print(f"      Has price info: {'✅ YES' if has_price_info else '❌ NO'}")
-        print(f"      Has ticket info: {'✅ YES' if has_ticket_info else '❌ NO'}")
+        if VERBOSE:
+            print(f"   📊 Response analysis:")
+            print(f"      Is booking request: {'❌ YES' if is_booking_request else '✅ NO'}")
+            print(f"      Has price info: {'✅ YES' if has_price_info else '❌ NO'}")
+            print(f"      Has ticket info: {'✅ YES' if has_ticket_info else '❌ NO'}")
         
         # Check data after question
         has_ticket_after = bool(session.get_context('parsed_ticket'))
         has_comparison_after = bool(session.get_context('price_comparison'))
         
-        print(f"   📱 After question - Ticket: {'✅' if has_ticket_after else '❌'}, Comparison: {'✅' if has_comparison_after else '❌'}")
+        if VERBOSE:
+            print(f"   📱 After question - Ticket: {'✅' if has_ticket_after else '❌'}, Comparison: {'✅' if has_comparison_after else '❌'}")
         
         # Determine success
         success = not is_booking_request and (has_price_info or has_ticket_info)
@@ -130,7 +151,11 @@ def test_post_booking_consistency():
     print(f"\n📊 CONSISTENCY ANALYSIS")
     print("=" * 25)
     
-    successful = sum(1 for r in results.values() if r['success'])
+    # Partition in one pass instead of re-walking results per section
+    working, failing = [], []
+    for q, r in results.items():
+        (working if r['success'] else failing).append((q, r))
+    successful = len(working)
     total = len(results)
     
     print(f"Successful questions: {successful}/{total}")
@@ -143,15 +168,13 @@ def test_post_booking_consistency():
         print(f"\n⚠️ INCONSISTENT - Some work, some don't")
         
         print(f"\nWorking questions:")
-        for q, r in results.items():
-            if r['success']:
-                print(f"   ✅ '{q}' - Action: {r['action_detected']}")
+        for q, r in working:
+            print(f"   ✅ '{q}' - Action: {r['action_detected']}")
         
         print(f"\nFailing questions:")
-        for q, r in results.items():
-            if not r['success']:
-                print(f"   ❌ '{q}' - Action: {r['action_detected']}")
-                print(f"      Response: {r['response_snippet']}")
+        for q, r in failing:
+            print(f"   ❌ '{q}' - Action: {r['action_detected']}")
+            print(f"      Response: {r['response_snippet']}")
     
     return successful == total
 
@@ -161,8 +184,9 @@ def test_data_persistence():
     print("=" * 30)
     
     phone_number = "+1234567891"
-    session_manager = SessionManager()
-    dialogue_manager = LLMDialogueManager(MockWhatsAppService())
+    svc = _services()
+    session_manager = svc.session_manager
+    dialogue_manager = svc.dialogue_manager
     
     # Clean start
     ticket_storage.clear_ticket_data(phone_number)
@@ -218,7 +242,7 @@ def test_action_detection():
     print(f"\n🔍 TESTING ACTION DETECTION")
     print("=" * 25)
     
-    dialogue_manager = LLMDialogueManager(MockWhatsAppService())
+    dialogue_manager = _services().dialogue_manager
     
     test_phrases = [
         "compare prices",
@@ -239,7 +263,8 @@ def test_action_detection():
     for phrase in test_phrases:
         action = dialogue_manager._detect_ticket_action(phrase)
         detected_actions[phrase] = action
-        print(f"      '{phrase}' -> '{action}'")
+        if VERBOSE:
+            print(f"      '{phrase}' -> '{action}'")
     
     # Count how many were detected as compare_prices
     compare_price_count = sum(1 for action in detected_actions.values() if action == 'compare_prices')
@@ -273,5 +298,4 @@ if __name__ == "__main__":
         
     except Exception as e:
         print(f"\n❌ Debug error: {e}")
-        import traceback
         traceback.print_exc() 
\ No newline at end of file
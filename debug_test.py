@@ -6,14 +6,14 @@ Debug test script for the flight booking chatbot
 from models.conversation import SessionManager, ConversationState
 from services.whatsapp_service import MockWhatsAppService
 from services.dialogue_manager import DialogueManager
-from services.intent_service import IntentService
+from services.intent_service import get_intent_service
 
 def debug_intent_detection():
     """Debug intent detection step by step"""
     print("🔍 Debugging Intent Detection")
     print("=" * 50)
     
-    intent_service = IntentService()
+    intent_service = get_intent_service()
     
     # Test city extraction
     test_messages = [
@@ -55,28 +55,28 @@ def debug_conversation_flow():
     phone_number = "+1234567890"
     session = session_manager.get_session(phone_number)
     
-    print(f"Initial state: {session.state.value}")
+    print(f"Initial state: {session.state.label}")
     print(f"Initial data: {session.data}")
     
     # Step 1: Flight booking intent
     print(f"\n📝 Step 1: Processing 'I want to book a flight'")
     response1 = dialogue_manager.process_message(session, "I want to book a flight")
     print(f"Response: {response1}")
-    print(f"State: {session.state.value}")
+    print(f"State: {session.state.label}")
     print(f"Data: {session.data}")
     
     # Step 2: Source city
     print(f"\n📝 Step 2: Processing 'Delhi'")
     response2 = dialogue_manager.process_message(session, "Delhi")
     print(f"Response: {response2}")
-    print(f"State: {session.state.value}")
+    print(f"State: {session.state.label}")
     print(f"Data: {session.data}")
     
     # Step 3: Destination city
     print(f"\n📝 Step 3: Processing 'Dubai'")
     response3 = dialogue_manager.process_message(session, "Dubai")
     print(f"Response: {response3}")
-    print(f"State: {session.state.value}")
+    print(f"State: {session.state.label}")
     print(f"Data: {session.data}")
 
 def test_flight_search():
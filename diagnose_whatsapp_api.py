@@ -6,14 +6,39 @@ Helps identify and troubleshoot API permission issues
 
 import os
 import sys
+import logging
+import traceback
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+PROBE_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+def log_probe_result(name: str, future) -> None:
+    """One machine-readable line per probe for CI log parsers"""
+    try:
+        logger.info("probe=%s status=%s", name, future.result().status_code)
+    except Exception as e:
+        logger.info("probe=%s status=error error=%s", name, e)
+
+def create_probe_session(token: str) -> requests.Session:
+    """One keep-alive session so every probe reuses the same TLS connection"""
+    session = requests.Session()
+    session.headers['Authorization'] = f'Bearer {token}'
+    retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+    session.mount('https://', adapter)
+    return session
+
 def test_whatsapp_api():
     """Test WhatsApp Business API configuration"""
     print("🔍 WhatsApp Business API Diagnostic Tool")
@@ -38,13 +63,32 @@ def test_whatsapp_api():
         print("   WHATSAPP_PHONE_NUMBER_ID=your_phone_number_id")
         return False
     
+    # The probes are independent, so fire them all at once and report in order
+    http = create_probe_session(token)
+    probe_urls = {
+        'phone': f"https://graph.facebook.com/v18.0/{phone_id}",
+        'me': "https://graph.facebook.com/v18.0/me",
+        'messaging': f"https://graph.facebook.com/v18.0/{phone_id}/phone_numbers",
+    }
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        probes = {
+            name: executor.submit(http.get, url, timeout=PROBE_TIMEOUT)
+            for name, url in probe_urls.items()
+        }
+        # Validate the query-string token on its own, without the session's header
+        probes['token'] = executor.submit(
+            http.get, f"https://graph.facebook.com/v18.0/me?access_token={token}",
+            headers={'Authorization': None}, timeout=PROBE_TIMEOUT
+        )
+    
+    for name, future in probes.items():
+        log_probe_result(name, future)
+    
     # Test 1: Check Phone Number Details
     print("🧪 Test 1: Phone Number Information")
-    phone_url = f"https://graph.facebook.com/v18.0/{phone_id}"
-    headers = {'Authorization': f'Bearer {token}'}
     
     try:
-        response = requests.get(phone_url, headers=headers)
+        response = probes['phone'].result()
         print(f"   Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -64,10 +108,9 @@ def test_whatsapp_api():
     
     # Test 2: Check App Permissions
     print("🧪 Test 2: App Permissions Check")
-    me_url = "https://graph.facebook.com/v18.0/me"
     
     try:
-        response = requests.get(me_url, headers=headers)
+        response = probes['me'].result()
         print(f"   Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -87,10 +130,8 @@ def test_whatsapp_api():
     print("🧪 Test 3: Messaging Permissions")
     
     # Try to get phone number info with messaging scope
-    messaging_url = f"https://graph.facebook.com/v18.0/{phone_id}/phone_numbers"
-    
     try:
-        response = requests.get(messaging_url, headers=headers)
+        response = probes['messaging'].result()
         print(f"   Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -110,10 +151,8 @@ def test_whatsapp_api():
     print("🧪 Test 4: Token Validation")
     
     # Check token info
-    token_url = f"https://graph.facebook.com/v18.0/me?access_token={token}"
-    
     try:
-        response = requests.get(token_url)
+        response = probes['token'].result()
         print(f"   Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -209,6 +248,7 @@ def quick_fix_guide():
         print("   ❌ No token found in environment")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(message)s')
     try:
         success = test_whatsapp_api()
         show_troubleshooting_guide()
@@ -221,5 +261,4 @@ if __name__ == "__main__":
             
     except Exception as e:
         print(f"\n❌ Diagnostic failed: {e}")
-        import traceback
         traceback.print_exc() 
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration for production deployments.
+
+Usage: gunicorn -c gunicorn.conf.py wsgi:application
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = 'gevent'
+worker_connections = 1000
+timeout = 30
+keepalive = 5
+
+# In-memory sessions live inside a single process, so several workers (and
+# preloading the app to share memory between them) need the Redis store
+shared_sessions = bool(os.getenv('REDIS_URL'))
+workers = int(os.getenv('WEB_CONCURRENCY', 4 if shared_sessions else 1))
+preload_app = shared_sessions
+
+# Let app.py take the gevent code path (greenlets instead of a thread pool)
+os.environ.setdefault('USE_GEVENT', 'True')
+
+
+def post_fork(server, worker):
+    """Start the session and ticket cleanup in each worker (timers do not survive fork)"""
+    from app import start_background_cleanup
+    start_background_cleanup()
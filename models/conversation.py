@@ -1,64 +1,120 @@
-from datetime import datetime, timedelta
-from enum import Enum
-from typing import Dict, Optional, Any
+from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from enum import Enum, IntEnum
+from typing import Dict, Iterator, Optional, Any, Tuple, Union
+import logging
+import orjson
+import pickle
+import threading
 import time
 
-class ConversationState(Enum):
-    GREETING = "greeting"
-    COLLECT_SOURCE = "collect_source"
-    COLLECT_DESTINATION = "collect_destination"
-    COLLECT_DATE = "collect_date"
-    COLLECT_PASSENGERS = "collect_passengers"
-    SHOW_FLIGHTS = "show_flights"
-    COLLECT_SELECTION = "collect_selection"
-    COLLECT_PASSENGER_DETAILS = "collect_passenger_details"
-    COLLECT_SSR = "collect_ssr"
-    CONFIRM_BOOKING = "confirm_booking"
-    COLLECT_OFFICE_ID = "collect_office_id"
-    COMPLETED = "completed"
+logger = logging.getLogger(__name__)
+
+class SessionBusyError(Exception):
+    """Another worker held the user's session lock for longer than lock_wait"""
+
+class ConversationState(IntEnum):
+    GREETING = 0
+    COLLECT_SOURCE = 1
+    COLLECT_DESTINATION = 2
+    COLLECT_DATE = 3
+    COLLECT_PASSENGERS = 4
+    SHOW_FLIGHTS = 5
+    COLLECT_SELECTION = 6
+    COLLECT_PASSENGER_DETAILS = 7
+    COLLECT_SSR = 8
+    CONFIRM_BOOKING = 9
+    COLLECT_OFFICE_ID = 10
+    COMPLETED = 11
+    
+    # Keep the readable form in logs (IntEnum prints the bare number)
+    __str__ = Enum.__str__
+    
+    @property
+    def label(self) -> str:
+        """String name used in API responses and dumps, e.g. 'collect_date'"""
+        return self.name.lower()
+
+# Flight search inputs, in FlightService.search_flights argument order
+SearchParams = namedtuple('SearchParams', 'origin destination date adults children infants')
+
+# Booking fields of a fresh session; copied per session, with new lists for the mutable values
+_DEFAULT_DATA = {
+    'source_city': None,
+    'destination_city': None,
+    'departure_date': None,
+    'return_date': None,
+    'adults': 1,
+    'children': 0,
+    'infants': 0,
+    'selected_flight': None,
+    'passengers': None,
+    'ssr': None,
+    'pnr': None,
+    'booking_confirmed': False
+}
 
 class ConversationSession:
+    # Thousands of live sessions: no per-instance __dict__
+    __slots__ = ('phone_number', 'state', 'created_at', 'last_activity', '_activity_mono',
+                 'retry_count', 'data', 'context')
+    
     def __init__(self, phone_number: str):
         self.phone_number = phone_number
         self.state = ConversationState.GREETING
         self.created_at = datetime.now()
-        self.last_activity = datetime.now()
-        self.data = {
-            'source_city': None,
-            'destination_city': None,
-            'departure_date': None,
-            'return_date': None,
-            'adults': 1,
-            'children': 0,
-            'infants': 0,
-            'selected_flight': None,
-            'passengers': [],
-            'ssr': [],
-            'pnr': None,
-            'booking_confirmed': False
-        }
+        self.update_activity()
+        # Bumped on every unrecognised reply, so it is a plain attribute rather than a context key
+        self.retry_count = 0
+        self.reset_data()
         self.context = {
             'last_message': None,
-            'retry_count': 0,
             'error_message': None,
             'available_flights': []
         }
     
+    def reset_data(self):
+        """Clear the booking fields back to their defaults"""
+        data = _DEFAULT_DATA.copy()
+        data['passengers'] = []
+        data['ssr'] = []
+        self.data = data
+    
     def update_activity(self):
         """Update last activity timestamp"""
-        self.last_activity = datetime.now()
+        # Epoch seconds are what gets persisted and displayed; the monotonic reading is
+        # only for in-process expiry checks, immune to wall-clock jumps
+        self.last_activity = time.time()
+        self._activity_mono = time.monotonic()
+    
+    def __getstate__(self):
+        # A monotonic reading is meaningless in another process or after a restart
+        return {name: getattr(self, name) for name in self.__slots__ if name != '_activity_mono'}
+    
+    def __setstate__(self, state: Dict):
+        for name, value in state.items():
+            setattr(self, name, value)
+        # Rebase the in-process clock on the persisted wall-clock time
+        idle = max(0.0, time.time() - self.last_activity)
+        self._activity_mono = time.monotonic() - idle
+    
+    @property
+    def last_activity_at(self) -> datetime:
+        """Wall-clock time of the last activity, for display"""
+        return datetime.fromtimestamp(self.last_activity)
     
     def is_expired(self, timeout_minutes: int = 30) -> bool:
         """Check if session has expired"""
-        expiry_time = self.last_activity + timedelta(minutes=timeout_minutes)
-        return datetime.now() > expiry_time
+        return time.monotonic() - self._activity_mono > timeout_minutes * 60
     
     def set_state(self, new_state: ConversationState):
         """Update conversation state"""
         self.state = new_state
         self.update_activity()
         # Reset retry count when moving to new state
-        self.context['retry_count'] = 0
+        self.retry_count = 0
     
     def set_data(self, key: str, value: Any):
         """Set data in conversation context"""
@@ -69,6 +125,13 @@ class ConversationSession:
         """Get data from conversation context"""
         return self.data.get(key, default)
     
+    def get_search_params(self) -> SearchParams:
+        """Flight search inputs collected so far (source and destination must be set)"""
+        data = self.data
+        return SearchParams(data['source_city']['iata'], data['destination_city']['iata'],
+                            data['departure_date'], data.get('adults', 1),
+                            data.get('children', 0), data.get('infants', 0))
+    
     def set_context(self, key: str, value: Any):
         """Set context information"""
         self.context[key] = value
@@ -80,59 +143,234 @@ class ConversationSession:
     
     def increment_retry(self):
         """Increment retry count for current state"""
-        self.context['retry_count'] = self.context.get('retry_count', 0) + 1
+        self.retry_count += 1
     
     def reset_retry(self):
         """Reset retry count"""
-        self.context['retry_count'] = 0
+        self.retry_count = 0
     
     def get_retry_count(self) -> int:
         """Get current retry count"""
-        return self.context.get('retry_count', 0)
+        return self.retry_count
     
     def to_dict(self) -> Dict:
         """Convert session to dictionary for storage/logging"""
         return {
             'phone_number': self.phone_number,
-            'state': self.state.value,
-            'created_at': self.created_at.isoformat(),
-            'last_activity': self.last_activity.isoformat(),
+            'state': self.state.label,
+            'created_at': self.created_at,
+            'last_activity': self.last_activity_at,
             'data': self.data,
-            'context': self.context
+            'context': {**self.context, 'retry_count': self.retry_count}
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize with orjson (datetimes are written as ISO 8601 natively)"""
+        return orjson.dumps(self.to_dict(), default=str)
+
+class BaseSessionManager(ABC):
+    """Interface shared by the in-memory and Redis session stores"""
+    # Whether the app must sweep expired sessions periodically
+    requires_cleanup = False
+    
+    def __init__(self, timeout_minutes: int = 30):
+        self.timeout_minutes = timeout_minutes
+    
+    def session_lock(self, phone_number: str):
+        """Context manager held around get_session ... save_session for one message"""
+        return nullcontext()
+    
+    @abstractmethod
+    def get_session(self, phone_number: str) -> ConversationSession:
+        ...
+    
+    @abstractmethod
+    def save_session(self, session: ConversationSession):
+        ...
+    
+    @abstractmethod
+    def iter_sessions(self) -> Iterator[Tuple[str, ConversationSession]]:
+        ...
+    
+    @abstractmethod
+    def cleanup_expired_sessions(self, timeout_minutes: Optional[int] = None):
+        ...
+    
+    @abstractmethod
+    def get_active_sessions_count(self) -> int:
+        ...
+    
+    @abstractmethod
+    def reset_session(self, phone_number: str):
+        ...
 
-class SessionManager:
-    def __init__(self):
-        self.sessions: Dict[str, ConversationSession] = {}
+class SessionManager(BaseSessionManager):
+    # In-process sessions must be swept periodically by the app
+    requires_cleanup = True
+    
+    def __init__(self, timeout_minutes: int = 30):
+        super().__init__(timeout_minutes)
+        # Kept in least-recently-active order so expiry only looks at the front
+        self.sessions: "OrderedDict[Union[int, str], ConversationSession]" = OrderedDict()
+        # Webhook handlers run concurrently (threads or greenlets)
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _session_key(phone_number: str) -> Union[int, str]:
+        """Key numeric phone numbers by int (cheaper to hash and store), others by str"""
+        try:
+            return int(phone_number)
+        except ValueError:
+            return phone_number
     
     def get_session(self, phone_number: str) -> ConversationSession:
         """Get or create session for phone number"""
-        if phone_number not in self.sessions:
-            self.sessions[phone_number] = ConversationSession(phone_number)
-        else:
-            # Check if session is expired
-            session = self.sessions[phone_number]
-            if session.is_expired():
-                # Create new session
-                self.sessions[phone_number] = ConversationSession(phone_number)
-        
-        return self.sessions[phone_number]
-    
-    def cleanup_expired_sessions(self, timeout_minutes: int = 30):
-        """Remove expired sessions"""
-        expired_sessions = []
-        for phone_number, session in self.sessions.items():
-            if session.is_expired(timeout_minutes):
-                expired_sessions.append(phone_number)
+        key = self._session_key(phone_number)
+        with self._lock:
+            session = self.sessions.get(key)
+            # A float compare; the bulk of expiry happens in the background sweep
+            if session is None or session.is_expired(self.timeout_minutes):
+                session = ConversationSession(phone_number)
+                self.sessions[key] = session
+            else:
+                session.update_activity()
+            self.sessions.move_to_end(key)
+            return session
+    
+    def save_session(self, session: ConversationSession):
+        """Persist session changes (sessions are live objects in memory, nothing to do)"""
+        pass
+    
+    def iter_sessions(self) -> Iterator[Tuple[str, ConversationSession]]:
+        """Iterate over a snapshot of (phone_number, session) pairs.
         
-        for phone_number in expired_sessions:
-            del self.sessions[phone_number]
+        The copy is taken under the lock so callers can iterate without
+        holding it while message handlers add or remove sessions.
+        """
+        with self._lock:
+            snapshot = [(session.phone_number, session) for session in self.sessions.values()]
+        return iter(snapshot)
+    
+    def cleanup_expired_sessions(self, timeout_minutes: Optional[int] = None):
+        """Remove expired sessions, oldest first, stopping at the first live one"""
+        timeout = (timeout_minutes or self.timeout_minutes) * 60
+        with self._lock:
+            now = time.monotonic()
+            while self.sessions:
+                session = next(iter(self.sessions.values()))
+                if now - session._activity_mono <= timeout:
+                    break
+                self.sessions.popitem(last=False)
     
     def get_active_sessions_count(self) -> int:
-        """Get count of active sessions"""
+        """Get count of active sessions (O(1); expired ones count until the next cleanup)"""
         return len(self.sessions)
     
     def reset_session(self, phone_number: str):
         """Reset session for phone number"""
-        if phone_number in self.sessions:
-            del self.sessions[phone_number] 
\ No newline at end of file
+        with self._lock:
+            self.sessions.pop(self._session_key(phone_number), None) 
+
+class RedisSessionManager(BaseSessionManager):
+    """Session store backed by Redis.
+    
+    Sessions are shared by every worker process, survive restarts and
+    expire through Redis TTLs, so no periodic cleanup is needed.
+    A session is a pickled copy, so callers hold session_lock() from
+    get_session to save_session; otherwise the last writer would win.
+    The lock is renewed while the caller runs, so slow handlers (PDF
+    parsing, Gemini) keep it however long they take.
+    """
+    key_prefix = 'sess:'
+    lock_prefix = 'sess-lock:'
+    # A lock outlives a crashed worker by at most lock_timeout; it is renewed every
+    # lock_timeout / 3 while held. Waiters give up after lock_wait (SessionBusyError)
+    lock_timeout = 30
+    lock_wait = 10
+    # Counting means scanning every key, so health checks reuse a recent count
+    count_cache_seconds = 30
+    
+    def __init__(self, redis_url: str, timeout_seconds: int = 1800):
+        import redis  # Optional dependency, only needed when REDIS_URL is set
+        super().__init__(timeout_seconds // 60)
+        self.redis = redis.Redis.from_url(redis_url)
+        self._lock_error = redis.exceptions.LockError
+        self.timeout_seconds = timeout_seconds
+        self._count = 0
+        self._counted_at = None
+    
+    def _key(self, phone_number: str) -> str:
+        return f"{self.key_prefix}{phone_number}"
+    
+    @contextmanager
+    def session_lock(self, phone_number: str):
+        """Per-user Redis lock, so concurrent messages cannot overwrite each other's session.
+        
+        Raises SessionBusyError when the lock is not acquired within lock_wait.
+        """
+        # The token is shared with the renewal thread, not kept thread-local
+        lock = self.redis.lock(f"{self.lock_prefix}{phone_number}", timeout=self.lock_timeout,
+                               blocking_timeout=self.lock_wait, thread_local=False)
+        if not lock.acquire():
+            raise SessionBusyError(phone_number)
+        
+        stop = threading.Event()
+        renewer = threading.Thread(target=self._renew_lock, args=(lock, stop, phone_number), daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            renewer.join()
+            try:
+                lock.release()
+            except self._lock_error as e:
+                # The lock expired and may now belong to another message
+                logger.warning("⚠️ Session lock for %s was lost before release: %s", phone_number, e)
+            except Exception as e:
+                logger.error("❌ Could not release session lock for %s: %s", phone_number, e)
+    
+    def _renew_lock(self, lock, stop: threading.Event, phone_number: str):
+        """Reset the lock's TTL to lock_timeout until stop is set"""
+        while not stop.wait(self.lock_timeout / 3):
+            try:
+                lock.reacquire()
+            except Exception as e:
+                logger.warning("⚠️ Could not renew session lock for %s: %s", phone_number, e)
+                return
+    
+    def get_session(self, phone_number: str) -> ConversationSession:
+        """Get or create session for phone number"""
+        raw = self.redis.get(self._key(phone_number))
+        if raw is None:
+            return ConversationSession(phone_number)
+        return pickle.loads(raw)
+    
+    def save_session(self, session: ConversationSession):
+        """Write session back and refresh its TTL"""
+        self.redis.set(self._key(session.phone_number), pickle.dumps(session),
+                       ex=self.timeout_seconds)
+    
+    def iter_sessions(self) -> Iterator[Tuple[str, ConversationSession]]:
+        """Lazily iterate over stored sessions"""
+        for key in self.redis.scan_iter(match=f"{self.key_prefix}*"):
+            raw = self.redis.get(key)
+            if raw is not None:
+                session = pickle.loads(raw)
+                yield session.phone_number, session
+    
+    def cleanup_expired_sessions(self, timeout_minutes: Optional[int] = None):
+        """Expiry is handled by Redis TTLs"""
+        pass
+    
+    def get_active_sessions_count(self) -> int:
+        """Get count of active sessions, rescanning at most every count_cache_seconds"""
+        now = time.monotonic()
+        if self._counted_at is None or now - self._counted_at >= self.count_cache_seconds:
+            self._count = sum(1 for _ in self.redis.scan_iter(match=f"{self.key_prefix}*"))
+            self._counted_at = now
+        return self._count
+    
+    def reset_session(self, phone_number: str):
+        """Reset session for phone number"""
+        self.redis.delete(self._key(phone_number))
@@ -1,11 +1,32 @@
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict
 from datetime import datetime
-import json
-import random
-import string
+import base64
+import os
+import sys
+import orjson
 
-@dataclass
+# Built once; generate_confirmation_message only fills in the fields
+CONFIRMATION_TEMPLATE = """🎫 *BOOKING CONFIRMED!*
+
+📋 *PNR:* {pnr}
+✈️ *Flight:* {airline} {flight_id}
+🛫 *Route:* {origin} → {destination}
+🕐 *Time:* {departure_time} - {arrival_time}
+💰 *Price:* ₹{price:,}
+
+{passenger_text}{ssr_text}
+
+📧 Confirmation sent to: {contact_email}
+📱 SMS sent to: {contact_phone}
+
+✅ *Status:* {status}
+🎟️ *Ticket:* {ticket_status}
+
+Thank you for booking with us! 🙏"""
+
+@dataclass(frozen=True, slots=True)
 class Flight:
     flight_id: str
     airline: str
@@ -17,8 +38,20 @@ class Flight:
     currency: str
     duration: str
     aircraft: str
+    _as_dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Small vocabularies: share one string object per distinct value across flights
+        for name in ('airline', 'origin', 'destination', 'currency', 'aircraft'):
+            object.__setattr__(self, name, sys.intern(getattr(self, name)))
     
     def to_dict(self) -> Dict:
+        """Serialized once; instances are immutable so the dict never goes stale"""
+        if self._as_dict is None:
+            object.__setattr__(self, '_as_dict', self._build_dict())
+        return self._as_dict
+    
+    def _build_dict(self) -> Dict:
         return {
             'flight_id': self.flight_id,
             'airline': self.airline,
@@ -41,15 +74,21 @@ class Flight:
 ⏱️ Duration: {self.duration}
 ✈️ Aircraft: {self.aircraft}"""
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Passenger:
     first_name: str
     last_name: str
     dob: str  # YYYY-MM-DD format
     passport_number: str
     nationality: str
+    _as_dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict:
+        if self._as_dict is None:
+            object.__setattr__(self, '_as_dict', self._build_dict())
+        return self._as_dict
+    
+    def _build_dict(self) -> Dict:
         return {
             'first_name': self.first_name,
             'last_name': self.last_name,
@@ -58,20 +97,30 @@ class Passenger:
             'nationality': self.nationality
         }
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SpecialServiceRequest:
     type: str  # MEAL, SEAT, ASSISTANCE, etc.
     code: str  # VGML, 12A, WCHR, etc.
     description: str
+    _as_dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'type', sys.intern(self.type))
+        object.__setattr__(self, 'code', sys.intern(self.code))
     
     def to_dict(self) -> Dict:
+        if self._as_dict is None:
+            object.__setattr__(self, '_as_dict', self._build_dict())
+        return self._as_dict
+    
+    def _build_dict(self) -> Dict:
         return {
             'type': self.type,
             'code': self.code,
             'description': self.description
         }
 
-@dataclass
+@dataclass(slots=True)
 class Booking:
     pnr: str
     flight: Flight
@@ -84,6 +133,7 @@ class Booking:
     ticket_issued: bool = False
     
     def to_dict(self) -> Dict:
+        # Bookings change (SSRs, ticketing), but the flight/passenger/SSR dicts are cached
         return {
             'pnr': self.pnr,
             'flight': self.flight.to_dict(),
@@ -91,57 +141,83 @@ class Booking:
             'contact_email': self.contact_email,
             'contact_phone': self.contact_phone,
             'special_requests': [ssr.to_dict() for ssr in self.special_requests],
-            'booking_date': self.booking_date.isoformat(),
+            'booking_date': self.booking_date,
             'status': self.status,
             'ticket_issued': self.ticket_issued
         }
     
+    def to_json(self) -> bytes:
+        """Serialize with orjson (datetimes are written as ISO 8601 natively)"""
+        return orjson.dumps(self.to_dict())
+    
     def generate_confirmation_message(self) -> str:
         """Generate booking confirmation message for WhatsApp"""
+        # str.join turns any iterable into a sequence first, so a list comprehension
+        # is the cheapest input; each section is built with a single join
         ssr_text = ""
         if self.special_requests:
-            ssr_list = [f"• {ssr.description}" for ssr in self.special_requests]
-            ssr_text = f"\n\n🍽️ *Special Requests:*\n" + "\n".join(ssr_list)
+            ssr_text = "\n\n🍽️ *Special Requests:*\n" + "\n".join(
+                [f"• {ssr.description}" for ssr in self.special_requests])
         
-        passenger_text = ""
         if len(self.passengers) == 1:
-            passenger_text = f"👤 *Passenger:* {self.passengers[0].first_name} {self.passengers[0].last_name}"
+            passenger = self.passengers[0]
+            passenger_text = f"👤 *Passenger:* {passenger.first_name} {passenger.last_name}"
         else:
-            passenger_names = [f"• {p.first_name} {p.last_name}" for p in self.passengers]
-            passenger_text = f"👥 *Passengers:*\n" + "\n".join(passenger_names)
+            passenger_text = "👥 *Passengers:*\n" + "\n".join(
+                [f"• {p.first_name} {p.last_name}" for p in self.passengers])
         
-        return f"""🎫 *BOOKING CONFIRMED!*
-
-📋 *PNR:* {self.pnr}
-✈️ *Flight:* {self.flight.airline} {self.flight.flight_id}
-🛫 *Route:* {self.flight.origin} → {self.flight.destination}
-🕐 *Time:* {self.flight.departure_time} - {self.flight.arrival_time}
-💰 *Price:* ₹{self.flight.price:,}
-
-{passenger_text}{ssr_text}
-
-📧 Confirmation sent to: {self.contact_email}
-📱 SMS sent to: {self.contact_phone}
-
-✅ *Status:* {self.status}
-🎟️ *Ticket:* {'Issued' if self.ticket_issued else 'Will be issued shortly'}
-
-Thank you for booking with us! 🙏"""
+        flight = self.flight
+        return CONFIRMATION_TEMPLATE.format_map({
+            'pnr': self.pnr,
+            'airline': flight.airline,
+            'flight_id': flight.flight_id,
+            'origin': flight.origin,
+            'destination': flight.destination,
+            'departure_time': flight.departure_time,
+            'arrival_time': flight.arrival_time,
+            'price': flight.price,
+            'passenger_text': passenger_text,
+            'ssr_text': ssr_text,
+            'contact_email': self.contact_email,
+            'contact_phone': self.contact_phone,
+            'status': self.status,
+            'ticket_status': 'Issued' if self.ticket_issued else 'Will be issued shortly'
+        })
 
 class BookingManager:
+    # 6 base32 characters give 2^30 PNRs, so a retry is already rare
+    MAX_PNR_ATTEMPTS = 10
+    # Random bytes per refill; a multiple of 5 encodes to base32 without padding
+    PNR_POOL_BYTES = 5 * 256
+    
     def __init__(self):
         self.bookings: Dict[str, Booking] = {}
+        self._pnr_pool: deque = deque()
+    
+    def _refill_pnr_pool(self):
+        """Cut a batch of PNRs out of one urandom read and base32 encode"""
+        encoded = base64.b32encode(os.urandom(self.PNR_POOL_BYTES)).decode()
+        self._pnr_pool.extend(encoded[i:i + 6] for i in range(0, len(encoded) - 5, 6))
     
     def generate_pnr(self) -> str:
-        """Generate a random PNR"""
-        return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        """Generate a random PNR (A-Z, 2-7), served from a pre-generated pool"""
+        # popleft() is atomic, so concurrent bookings racing for the last PNR
+        # just refill and retry instead of checking emptiness first
+        while True:
+            try:
+                return self._pnr_pool.popleft()
+            except IndexError:
+                self._refill_pnr_pool()
     
     def create_booking(self, flight: Flight, passengers: List[Passenger], 
                       contact_email: str, contact_phone: str) -> Booking:
         """Create a new booking"""
-        pnr = self.generate_pnr()
-        while pnr in self.bookings:  # Ensure unique PNR
+        for _ in range(self.MAX_PNR_ATTEMPTS):
             pnr = self.generate_pnr()
+            if pnr not in self.bookings:  # Ensure unique PNR
+                break
+        else:
+            raise RuntimeError("Could not generate a unique PNR")
         
         booking = Booking(
             pnr=pnr,
@@ -175,6 +251,10 @@ class BookingManager:
     def get_booking(self, pnr: str) -> Optional[Booking]:
         """Get booking by PNR"""
         return self.bookings.get(pnr)
+    
+    def remove_booking(self, pnr: str):
+        """Drop a booking that could not be completed"""
+        self.bookings.pop(pnr, None)
 
 # SSR Code mappings
 SSR_CODES = {
@@ -200,4 +280,19 @@ SSR_CODES = {
         'extra': {'code': 'XBAG', 'description': 'Extra Baggage (15kg)'},
         'sports': {'code': 'SPBG', 'description': 'Sports Equipment'}
     }
-} 
\ No newline at end of file
+}
+
+# Flattened (category, preference) -> SpecialServiceRequest; instances are frozen so they can be shared
+_SSR_FLAT = {
+    (category, preference): SpecialServiceRequest(
+        type=category.upper(),
+        code=info['code'],
+        description=info['description']
+    )
+    for category, preferences in SSR_CODES.items()
+    for preference, info in preferences.items()
+}
+
+def get_ssr(category: str, preference: str) -> Optional[SpecialServiceRequest]:
+    """Look up the SSR for a category/preference pair"""
+    return _SSR_FLAT.get((category, preference))
@@ -3,163 +3,291 @@ Persistent Ticket Storage System
 Stores parsed ticket data that survives session timeouts
 """
 
-import json
 import os
+import sqlite3
 import tempfile
-from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+import threading
+import time
+from functools import lru_cache
+from datetime import datetime
+from typing import Dict, Optional, Any, Tuple
 import logging
+import orjson
+from utils.lru import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Characters dropped from phone numbers, applied in a single translate() pass
+_PHONE_STRIP = str.maketrans('', '', '+- ')
+
+@lru_cache(maxsize=4096)
+def _clean_phone(phone_number: str) -> str:
+    """Clean phone number so formatting differences map to the same row"""
+    return phone_number.translate(_PHONE_STRIP)
+
+def _encode(payload: Optional[Dict]) -> Optional[bytes]:
+    """Compact orjson bytes for a BLOB column; a missing payload is stored as NULL"""
+    return None if payload is None else orjson.dumps(payload)
+
+def _decode(blob: Optional[bytes]) -> Optional[Dict]:
+    return None if blob is None else orjson.loads(blob)
+
 class TicketStorage:
-    """Persistent storage for parsed ticket data"""
+    """Persistent storage for parsed ticket data, one SQLite row per user"""
     
-    def __init__(self):
-        # Use temp directory for storage (in production, use database)
+    # Decoded tickets kept in memory, least recently used evicted first
+    cache_size = 1024
+    
+    def __init__(self, db_path: Optional[str] = None):
+        # Use temp directory for storage unless a database path is given
         self.storage_dir = os.path.join(tempfile.gettempdir(), 'flight_tickets')
         os.makedirs(self.storage_dir, exist_ok=True)
+        self.db_path = db_path or os.path.join(self.storage_dir, 'tickets.db')
         
         # Ticket data expires after 24 hours
         self.expiry_hours = 24
+        
+        # Decoded tickets keyed by storage key, with the stored_at (ms) they were read at.
+        # stored_at changes on every store, so it tells us when another worker rewrote the row
+        self._cache = LRUCache(self.cache_size)
+        
+        # One connection per process, opened on first use and reused for its lifetime.
+        # Threads share it one statement at a time; WAL lets other worker processes keep
+        # reading while one writes, and the connect timeout makes competing writers wait
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._db_lock = threading.Lock()
+        
+        # Expiry is a unix epoch so checks are integer compares, never payload parses
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS tickets ('
+            'phone TEXT PRIMARY KEY, '
+            'stored_at INTEGER NOT NULL, '  # Milliseconds, doubles as the row version
+            'expires_at INTEGER NOT NULL, '
+            'ticket_info BLOB, '
+            'price_comparison BLOB)'
+        )
+        # Phone lookups already go through the primary key's unique index; expiry gets its
+        # own so the cleanup DELETE and expired counts do not scan the table
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tickets_expires_at ON tickets(expires_at)')
+        self._migrate_legacy_files()
     
-    def _get_ticket_file_path(self, phone_number: str) -> str:
-        """Get file path for user's ticket data"""
-        # Clean phone number for filename
-        clean_phone = phone_number.replace('+', '').replace('-', '').replace(' ', '')
-        return os.path.join(self.storage_dir, f"ticket_{clean_phone}.json")
+    def _migrate_legacy_files(self):
+        """One-shot import of per-user ticket_*.json files written by the old file store"""
+        migrated = 0
+        # scandir yields names and file types from the directory read, no stat() per entry
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith('ticket_') and entry.name.endswith('.json')
+                        and entry.is_file()):
+                    continue
+                try:
+                    with open(entry.path, 'rb') as f:
+                        data = orjson.loads(f.read())
+                    expires_at = int(datetime.fromisoformat(data['expires_at']).timestamp())
+                    if expires_at > time.time():
+                        # Never overwrite a row stored since the upgrade
+                        self._execute(
+                            'INSERT OR IGNORE INTO tickets VALUES (?, ?, ?, ?, ?)',
+                            (entry.name[len('ticket_'):-len('.json')],
+                             int(datetime.fromisoformat(data['stored_at']).timestamp() * 1000),
+                             expires_at, _encode(data.get('ticket_info')),
+                             _encode(data.get('price_comparison')))
+                        )
+                        migrated += 1
+                except Exception as e:
+                    logger.warning("⚠️ Skipping unreadable ticket file %s: %s", entry.name, e)
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass  # Another worker migrated it first
+        
+        if migrated:
+            logger.info("📦 Migrated %d ticket files into %s", migrated, self.db_path)
+    
+    def _ticket_key(self, phone_number: str) -> str:
+        """Get the storage key for a user's ticket data"""
+        # The same few numbers come back on every message, so the cleaned form is memoized
+        return _clean_phone(phone_number)
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This process's connection (a connection must never be used across fork,
+        e.g. when gunicorn preloads the app, so a forked worker opens its own)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            # Autocommit, so every statement stands alone
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-64000')
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+    
+    def close(self):
+        """Close this process's connection (it is reopened on next use)"""
+        with self._db_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+    
+    def _execute(self, sql: str, params: Tuple = ()) -> int:
+        """Run a write statement and return the number of rows it changed"""
+        with self._db_lock:
+            return self.conn.execute(sql, params).rowcount
+    
+    def _fetchone(self, sql: str, params: Tuple = ()) -> Optional[Tuple]:
+        with self._db_lock:
+            return self.conn.execute(sql, params).fetchone()
+    
+    @staticmethod
+    def _ticket_data(phone_number: str, stored_at: int, expires_at: int,
+                     ticket_info: Optional[Dict], price_comparison: Optional[Dict]) -> Dict:
+        # Timestamps stay unix epoch seconds; nothing reads them as text, so no ISO formatting
+        return {
+            'phone_number': phone_number,
+            'stored_at': stored_at // 1000,
+            'expires_at': expires_at,
+            'ticket_info': ticket_info,
+            'price_comparison': price_comparison
+        }
     
     def store_ticket_data(self, phone_number: str, ticket_info: Dict, price_comparison: Optional[Dict] = None) -> bool:
         """Store ticket and price comparison data persistently"""
         try:
-            data = {
-                'phone_number': phone_number,
-                'stored_at': datetime.now().isoformat(),
-                'expires_at': (datetime.now() + timedelta(hours=self.expiry_hours)).isoformat(),
-                'ticket_info': ticket_info,
-                'price_comparison': price_comparison
-            }
-            
-            file_path = self._get_ticket_file_path(phone_number)
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            key = self._ticket_key(phone_number)
+            stored_at = time.time_ns() // 1_000_000
+            expires_at = stored_at // 1000 + self.expiry_hours * 3600
+            # Single-statement upsert: readers see either the old ticket or the new one,
+            # never a gap or a half-written row, and the row is updated in place
+            self._execute(
+                'INSERT INTO tickets VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(phone) DO UPDATE SET stored_at = excluded.stored_at, '
+                'expires_at = excluded.expires_at, ticket_info = excluded.ticket_info, '
+                'price_comparison = excluded.price_comparison',
+                (key, stored_at, expires_at, _encode(ticket_info), _encode(price_comparison))
+            )
+            self._cache.put(key, (stored_at, self._ticket_data(
+                phone_number, stored_at, expires_at, ticket_info, price_comparison)))
             
-            logger.info(f"✅ Ticket data stored for {phone_number}")
+            logger.debug("✅ Ticket data stored for %s", phone_number)
             return True
-            
+        
         except Exception as e:
-            logger.error(f"❌ Failed to store ticket data for {phone_number}: {e}")
+            logger.error("❌ Failed to store ticket data for %s: %s", phone_number, e)
             return False
     
     def get_ticket_data(self, phone_number: str) -> Optional[Dict]:
         """Retrieve stored ticket data if not expired"""
         try:
-            file_path = self._get_ticket_file_path(phone_number)
+            key = self._ticket_key(phone_number)
+            now = int(time.time())
             
-            if not os.path.exists(file_path):
-                return None
-            
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            # Warm path: confirm the cached copy is still current with an integer-only
+            # lookup instead of fetching and decoding the payloads again
+            cached = self._cache.get(key)
+            if cached is not None:
+                row = self._fetchone(
+                    'SELECT stored_at FROM tickets WHERE phone = ? AND expires_at >= ?', (key, now)
+                )
+                if row is None:
+                    self._cache.pop(key)
+                    return None
+                if row[0] == cached[0]:
+                    logger.debug("✅ Retrieved ticket data for %s", phone_number)
+                    return cached[1]
             
-            # Check if data has expired
-            expires_at = datetime.fromisoformat(data['expires_at'])
-            if datetime.now() > expires_at:
-                # Clean up expired data
-                os.remove(file_path)
-                logger.info(f"🗑️ Expired ticket data removed for {phone_number}")
+            # Expired rows are filtered out by the integer column, so their payloads are
+            # never read or decoded; cleanup_expired_tickets deletes them in bulk
+            row = self._fetchone(
+                'SELECT stored_at, expires_at, ticket_info, price_comparison '
+                'FROM tickets WHERE phone = ? AND expires_at >= ?', (key, now)
+            )
+            if row is None:
+                self._cache.pop(key)
                 return None
             
-            logger.info(f"✅ Retrieved ticket data for {phone_number}")
-            return data
+            stored_at, expires_at, ticket_info, price_comparison = row
+            data = self._ticket_data(phone_number, stored_at, expires_at,
+                                     _decode(ticket_info), _decode(price_comparison))
+            self._cache.put(key, (stored_at, data))
             
+            logger.debug("✅ Retrieved ticket data for %s", phone_number)
+            return data
+        
         except Exception as e:
-            logger.error(f"❌ Failed to retrieve ticket data for {phone_number}: {e}")
+            logger.error("❌ Failed to retrieve ticket data for %s: %s", phone_number, e)
             return None
     
     def has_ticket_data(self, phone_number: str) -> bool:
         """Check if user has stored ticket data"""
-        return self.get_ticket_data(phone_number) is not None
+        try:
+            # Existence and expiry only, answered from the indexes; payloads are never read
+            row = self._fetchone(
+                'SELECT EXISTS(SELECT 1 FROM tickets WHERE phone = ? AND expires_at >= ?)',
+                (self._ticket_key(phone_number), int(time.time()))
+            )
+            return bool(row[0])
+        except Exception as e:
+            logger.error("❌ Failed to check ticket data for %s: %s", phone_number, e)
+            return False
     
     def clear_ticket_data(self, phone_number: str) -> bool:
         """Clear stored ticket data for user"""
         try:
-            file_path = self._get_ticket_file_path(phone_number)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"🗑️ Ticket data cleared for {phone_number}")
+            key = self._ticket_key(phone_number)
+            self._cache.pop(key)
+            if self._execute('DELETE FROM tickets WHERE phone = ?', (key,)):
+                logger.debug("🗑️ Ticket data cleared for %s", phone_number)
                 return True
             return False
         except Exception as e:
-            logger.error(f"❌ Failed to clear ticket data for {phone_number}: {e}")
+            logger.error("❌ Failed to clear ticket data for %s: %s", phone_number, e)
             return False
     
     def cleanup_expired_tickets(self) -> int:
-        """Clean up all expired ticket files"""
+        """Clean up all expired tickets"""
         cleaned_count = 0
         try:
-            if not os.path.exists(self.storage_dir):
-                return 0
+            now = int(time.time())
+            # One statement for the whole batch; live rows are never read
+            cleaned_count = self._execute('DELETE FROM tickets WHERE expires_at < ?', (now,))
             
-            for filename in os.listdir(self.storage_dir):
-                if filename.startswith('ticket_') and filename.endswith('.json'):
-                    file_path = os.path.join(self.storage_dir, filename)
-                    
-                    try:
-                        with open(file_path, 'r') as f:
-                            data = json.load(f)
-                        
-                        expires_at = datetime.fromisoformat(data['expires_at'])
-                        if datetime.now() > expires_at:
-                            os.remove(file_path)
-                            cleaned_count += 1
-                            
-                    except Exception:
-                        # Remove corrupted files
-                        os.remove(file_path)
-                        cleaned_count += 1
+            # Drop the decoded copies in the same pass so they do not wait for LRU eviction
+            self._cache.discard_where(lambda cached: cached[1]['expires_at'] < now)
             
             if cleaned_count > 0:
-                logger.info(f"🧹 Cleaned up {cleaned_count} expired ticket files")
-                
+                logger.info("🧹 Cleaned up %d expired tickets", cleaned_count)
+        
         except Exception as e:
-            logger.error(f"❌ Error during cleanup: {e}")
+            logger.error("❌ Error during cleanup: %s", e)
         
         return cleaned_count
     
     def get_storage_info(self) -> Dict:
         """Get information about ticket storage"""
         info = {
-            'storage_dir': self.storage_dir,
+            'db_path': self.db_path,
             'total_tickets': 0,
             'expired_tickets': 0,
             'active_tickets': 0
         }
         
         try:
-            if os.path.exists(self.storage_dir):
-                for filename in os.listdir(self.storage_dir):
-                    if filename.startswith('ticket_') and filename.endswith('.json'):
-                        info['total_tickets'] += 1
-                        
-                        try:
-                            file_path = os.path.join(self.storage_dir, filename)
-                            with open(file_path, 'r') as f:
-                                data = json.load(f)
-                            
-                            expires_at = datetime.fromisoformat(data['expires_at'])
-                            if datetime.now() > expires_at:
-                                info['expired_tickets'] += 1
-                            else:
-                                info['active_tickets'] += 1
-                                
-                        except Exception:
-                            info['expired_tickets'] += 1
-                            
+            # Both counts from one scan of the expiry column
+            total, expired = self._fetchone(
+                'SELECT COUNT(*), COALESCE(SUM(expires_at < ?), 0) FROM tickets',
+                (int(time.time()),)
+            )
+            info['total_tickets'] = total
+            info['expired_tickets'] = expired
+            info['active_tickets'] = total - expired
+        
         except Exception as e:
-            logger.error(f"Error getting storage info: {e}")
+            logger.error("Error getting storage info: %s", e)
         
         return info
 
 # Global ticket storage instance
-ticket_storage = TicketStorage() 
\ No newline at end of file
+ticket_storage = TicketStorage()
@@ -1,23 +1,227 @@
 import logging
+import re
+import time
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from models.conversation import ConversationState, ConversationSession
-from services.intent_service import IntentService
+from config.settings import Config
+from utils.lru import LRUCache
+
+from models.conversation import ConversationState, ConversationSession, SearchParams
+from services.intent_service import get_intent_service
 from services.flight_service import FlightService
 from services.whatsapp_service import WhatsAppService
 from models.flight_data import Flight, Passenger
 
 logger = logging.getLogger(__name__)
 
+# Words marking a lone city in the opening message as the departure city
+_SOURCE_HINT_RE = re.compile(r'\b(?:from|starting|leaving)\b', re.IGNORECASE)
+
+# Reply texts are built once at import; templates are filled with str.format
+_MSG_WELCOME = """✈️ *Welcome to Flight Booking Assistant!*
+
+I can help you book flights quickly and easily. To get started, just tell me:
+
+*Examples:*
+• "I want to book a flight"
+• "Flight to Dubai"
+• "Book flight from Delhi to Mumbai tomorrow"
+
+*What can I help you with today?* 🛫"""
+
+_MSG_SOURCE_HELP = """🏙️ I couldn't find that city. Please provide a valid departure city.
+
+*Examples:* Delhi, Mumbai, Bangalore, Hyderabad, Chennai
+
+*Which city are you flying from?*"""
+
+_NO_ROUTE_TEMPLATE = """❌ No flights available from {source} to {destination}.
+
+*Available destinations from {source}:*
+{destinations}
+
+*Please choose one of these destinations:*"""
+
+_MSG_DESTINATION_HELP = """🏙️ I couldn't find that city. Please provide a valid destination city.
+
+*Examples:* Dubai, London, Singapore, Bangkok
+
+*Where would you like to fly to?*"""
+
+_MSG_DATE_HELP = """📅 I couldn't understand the date. Please provide your travel date.
+
+*Examples:*
+• "July 15"
+• "15/07/2025"
+• "Tomorrow"
+• "Next week"
+
+*When would you like to travel?*"""
+
+_MSG_PASSENGER_COUNT_HELP = """👥 Please tell me how many passengers will be traveling.
+
+*Examples:*
+• "1 adult"
+• "2 adults"
+• "2 adults and 1 child"
+• "Just me"
+
+*How many passengers?*"""
+
+_FLIGHT_SELECTED_TEMPLATE = """✅ *Flight Selected:* {airline} {flight_id}
+
+👤 *Passenger Details Required:*
+Please provide passenger information in this format:
+*Full Name, Date of Birth, Passport Number, Nationality*
+
+*Example:*
+John Doe, 10-May-1990, A1234567, Indian
+
+*Please enter passenger details:*"""
+
+_FLIGHT_SELECTED_GROUP_TEMPLATE = """✅ *Flight Selected:* {airline} {flight_id}
+
+👥 *Passenger Details Required ({adults} passengers):*
+Please provide details for passenger 1 in this format:
+*Full Name, Date of Birth, Passport Number, Nationality*
+
+*Example:*
+John Doe, 10-May-1990, A1234567, Indian
+
+*Passenger 1 details:*"""
+
+_INVALID_SELECTION_TEMPLATE = """❌ Invalid selection. Please choose a number between 1 and {count}.
+
+*Example:* Type "*1*" to select the first option.
+
+*Which flight would you like to select?*"""
+
+_PASSENGER_SAVED_TEMPLATE = """✅ *Passenger {saved} details saved!*
+
+👤 *Please provide details for passenger {next}:*
+*Full Name, Date of Birth, Passport Number, Nationality*
+
+*Passenger {next} details:*"""
+
+_MSG_SSR_PROMPT = """✅ *All passenger details saved!*
+
+🍽️ *Special Requests (Optional):*
+Do you have any special requests for your flight?
+
+*Examples:*
+• "Vegetarian meal and window seat"
+• "Wheelchair assistance"
+• "Extra baggage"
+• "No special requests"
+
+*Any special requests?*"""
+
+_MSG_PASSENGER_DETAILS_HELP = """❌ Invalid format. Please provide passenger details in this format:
+
+*Full Name, Date of Birth, Passport Number, Nationality*
+
+*Example:*
+John Doe, 10-May-1990, A1234567, Indian
+
+*Please try again:*"""
+
+_MSG_CONFIRM_PROMPT = """Please confirm your booking:
+
+• Type "*yes*" or "*confirm*" to proceed with booking
+• Type "*no*" or "*cancel*" to cancel
+
+*Would you like to proceed?*"""
+
+_MSG_COMPLETED_HELP = """✈️ *How can I help you today?*
+
+• Type "*book flight*" to start a new booking
+• Type "*help*" for assistance
+
+*What would you like to do?*"""
+
+_MSG_HUMAN_SUPPORT = """🆘 *Need Human Assistance*
+
+I'm having trouble understanding your request. Let me connect you with our support team.
+
+*Your support ticket ID: #12345*
+
+Meanwhile, you can:
+• Try rephrasing your request
+• Type "*help*" for assistance
+• Type "*book flight*" to start over
+
+Our team will contact you shortly! 📞"""
+
+_BOOKING_SUMMARY_TEMPLATE = """📋 *BOOKING SUMMARY*
+
+✈️ *Flight:* {airline} {flight_id}
+🛫 *Route:* {source} → {destination}
+📅 *Date:* {date}
+🕐 *Time:* {departure_time} - {arrival_time}
+💰 *Total Price:* ₹{price:,}
+
+{passenger_summary}{ssr_summary}
+
+*Please confirm your booking:*
+• Type "*yes*" or "*confirm*" to proceed
+• Type "*no*" or "*cancel*" to cancel
+
+*Proceed with booking?*"""
+
+def _format_other_ssr(ssr: Dict) -> str:
+    return f"• {ssr['preference'].title()}"
+
+# Booking summary line per special request type (anything else uses _format_other_ssr)
+_SSR_FORMATTERS = {
+    'meal': lambda ssr: f"• {ssr['preference'].title()} meal",
+    'seat': lambda ssr: f"• {ssr['preference'].replace('_', ' ').title()} seat",
+}
+
+# Required booking fields in the order they are asked for:
+# (data key, state that collects it, prompt, earlier field whose city name fills the prompt)
+_NEXT_STEP_RULES = (
+    ('source_city', ConversationState.COLLECT_SOURCE,
+     "🛫 *Great! Let's book your flight.*\n\n*Which city are you flying from?*", None),
+    ('destination_city', ConversationState.COLLECT_DESTINATION,
+     "🛬 *Flying from {name}.*\n\n*Where would you like to go?*", 'source_city'),
+    ('departure_date', ConversationState.COLLECT_DATE,
+     "📅 *Flying to {name}.*\n\n*When would you like to travel?*", 'destination_city'),
+)
+
 class DialogueManager:
     def __init__(self, whatsapp_service: WhatsAppService):
-        self.intent_service = IntentService()
+        self.intent_service = get_intent_service()
         self.flight_service = FlightService()
         self.whatsapp_service = whatsapp_service
         
         # Maximum retry attempts before offering human support
         self.max_retries = 3
+        
+        # IATA code -> city name (cities_data never changes at runtime)
+        self._iata_to_name: Dict[str, str] = {
+            city_data['iata']: city_data['name']
+            for city_data in self.intent_service.cities_data['cities'].values()
+        }
+        
+        # Recent searches keyed by route, date and passenger mix -> (searched_at, flights),
+        # so re-entering flight display (e.g. after an invalid selection) skips the API call
+        self._search_cache = LRUCache(Config.FLIGHT_SEARCH_CACHE_SIZE)
+        
+        # State -> handler, bound once so routing a message is a single dict lookup
+        self._handlers = {
+            ConversationState.GREETING: self._handle_greeting,
+            ConversationState.COLLECT_SOURCE: self._handle_source_collection,
+            ConversationState.COLLECT_DESTINATION: self._handle_destination_collection,
+            ConversationState.COLLECT_DATE: self._handle_date_collection,
+            ConversationState.COLLECT_PASSENGERS: self._handle_passenger_collection,
+            ConversationState.SHOW_FLIGHTS: self._handle_flight_display,
+            ConversationState.COLLECT_SELECTION: self._handle_flight_selection,
+            ConversationState.COLLECT_PASSENGER_DETAILS: self._handle_passenger_details_collection,
+            ConversationState.COLLECT_SSR: self._handle_ssr_collection,
+            ConversationState.CONFIRM_BOOKING: self._handle_booking_confirmation,
+            ConversationState.COMPLETED: self._handle_completed_state,
+        }
     
     def process_message(self, session: ConversationSession, message: str) -> str:
         """Process incoming message and return response"""
@@ -25,33 +229,11 @@ class DialogueManager:
             session.set_context('last_message', message)
             
             # Route to appropriate handler based on current state
-            if session.state == ConversationState.GREETING:
-                return self._handle_greeting(session, message)
-            elif session.state == ConversationState.COLLECT_SOURCE:
-                return self._handle_source_collection(session, message)
-            elif session.state == ConversationState.COLLECT_DESTINATION:
-                return self._handle_destination_collection(session, message)
-            elif session.state == ConversationState.COLLECT_DATE:
-                return self._handle_date_collection(session, message)
-            elif session.state == ConversationState.COLLECT_PASSENGERS:
-                return self._handle_passenger_collection(session, message)
-            elif session.state == ConversationState.SHOW_FLIGHTS:
-                return self._handle_flight_display(session, message)
-            elif session.state == ConversationState.COLLECT_SELECTION:
-                return self._handle_flight_selection(session, message)
-            elif session.state == ConversationState.COLLECT_PASSENGER_DETAILS:
-                return self._handle_passenger_details_collection(session, message)
-            elif session.state == ConversationState.COLLECT_SSR:
-                return self._handle_ssr_collection(session, message)
-            elif session.state == ConversationState.CONFIRM_BOOKING:
-                return self._handle_booking_confirmation(session, message)
-            elif session.state == ConversationState.COMPLETED:
-                return self._handle_completed_state(session, message)
-            else:
-                return self._handle_unknown_state(session, message)
+            handler = self._handlers.get(session.state, self._handle_unknown_state)
+            return handler(session, message)
                 
         except Exception as e:
-            logger.error(f"Error processing message: {e}")
+            logger.error("Error processing message: %s", e)
             return "❌ Something went wrong. Please try again or type 'help' for assistance."
     
     def _handle_greeting(self, session: ConversationSession, message: str) -> str:
@@ -70,7 +252,7 @@ class DialogueManager:
                 session.set_data('destination_city', cities[1])
             elif len(cities) == 1:
                 # Determine if it's source or destination based on message context
-                if any(word in message.lower() for word in ['from', 'starting', 'leaving']):
+                if _SOURCE_HINT_RE.search(message):
                     session.set_data('source_city', cities[0])
                 else:
                     session.set_data('destination_city', cities[0])
@@ -87,16 +269,7 @@ class DialogueManager:
             return self._determine_next_step(session)
         else:
             # Not a flight booking request
-            return """✈️ *Welcome to Flight Booking Assistant!*
-
-I can help you book flights quickly and easily. To get started, just tell me:
-
-*Examples:*
-• "I want to book a flight"
-• "Flight to Dubai"
-• "Book flight from Delhi to Mumbai tomorrow"
-
-*What can I help you with today?* 🛫"""
+            return _MSG_WELCOME
     
     def _handle_source_collection(self, session: ConversationSession, message: str) -> str:
         """Handle source city collection"""
@@ -112,11 +285,7 @@ I can help you book flights quickly and easily. To get started, just tell me:
             if session.get_retry_count() >= self.max_retries:
                 return self._offer_human_support(session)
             
-            return f"""🏙️ I couldn't find that city. Please provide a valid departure city.
-
-*Examples:* Delhi, Mumbai, Bangalore, Hyderabad, Chennai
-
-*Which city are you flying from?*"""
+            return _MSG_SOURCE_HELP
     
     def _handle_destination_collection(self, session: ConversationSession, message: str) -> str:
         """Handle destination city collection"""
@@ -135,14 +304,12 @@ I can help you book flights quickly and easily. To get started, just tell me:
             if source_city and not self.flight_service.validate_route(source_city['iata'], destination_city['iata']):
                 available_destinations = self.flight_service.get_available_destinations_from(source_city['iata'])
                 if available_destinations:
-                    dest_names = [self._get_city_name_by_iata(iata) for iata in available_destinations]
+                    names = self._iata_to_name
                     session.increment_retry()
-                    return f"""❌ No flights available from {source_city['name']} to {destination_city['name']}.
-
-*Available destinations from {source_city['name']}:*
-{', '.join(dest_names)}
-
-*Please choose one of these destinations:*"""
+                    return _NO_ROUTE_TEMPLATE.format(
+                        source=source_city['name'],
+                        destination=destination_city['name'],
+                        destinations=', '.join(names.get(iata, iata) for iata in available_destinations))
             
             session.set_data('destination_city', destination_city)
             session.reset_retry()
@@ -152,11 +319,7 @@ I can help you book flights quickly and easily. To get started, just tell me:
             if session.get_retry_count() >= self.max_retries:
                 return self._offer_human_support(session)
             
-            return f"""🏙️ I couldn't find that city. Please provide a valid destination city.
-
-*Examples:* Dubai, London, Singapore, Bangkok
-
-*Where would you like to fly to?*"""
+            return _MSG_DESTINATION_HELP
     
     def _handle_date_collection(self, session: ConversationSession, message: str) -> str:
         """Handle travel date collection"""
@@ -171,65 +334,38 @@ I can help you book flights quickly and easily. To get started, just tell me:
             if session.get_retry_count() >= self.max_retries:
                 return self._offer_human_support(session)
             
-            return f"""📅 I couldn't understand the date. Please provide your travel date.
-
-*Examples:*
-• "July 15"
-• "15/07/2025"
-• "Tomorrow"
-• "Next week"
-
-*When would you like to travel?*"""
+            return _MSG_DATE_HELP
     
     def _handle_passenger_collection(self, session: ConversationSession, message: str) -> str:
         """Handle passenger count collection"""
         passenger_counts = self.intent_service.extract_passenger_count(message)
+        adults = passenger_counts['adults']
+        children = passenger_counts['children']
+        infants = passenger_counts['infants']
+        total_passengers = adults + children + infants
         
-        total_passengers = passenger_counts['adults'] + passenger_counts['children'] + passenger_counts['infants']
+        # Nothing recognised: ask again (checked first, it is the common retry path)
+        if total_passengers == 0:
+            session.increment_retry()
+            if session.get_retry_count() >= self.max_retries:
+                return self._offer_human_support(session)
+            
+            return _MSG_PASSENGER_COUNT_HELP
         
         if total_passengers > 9:
             session.increment_retry()
             return "👥 Maximum 9 passengers allowed per booking. Please reduce the number of passengers."
         
-        if total_passengers > 0:
-            session.set_data('adults', passenger_counts['adults'])
-            session.set_data('children', passenger_counts['children'])
-            session.set_data('infants', passenger_counts['infants'])
-            session.reset_retry()
-            return self._determine_next_step(session)
-        else:
-            session.increment_retry()
-            if session.get_retry_count() >= self.max_retries:
-                return self._offer_human_support(session)
-            
-            return f"""👥 Please tell me how many passengers will be traveling.
-
-*Examples:*
-• "1 adult"
-• "2 adults"
-• "2 adults and 1 child"
-• "Just me"
-
-*How many passengers?*"""
+        session.set_data('adults', adults)
+        session.set_data('children', children)
+        session.set_data('infants', infants)
+        session.reset_retry()
+        return self._determine_next_step(session)
     
     def _handle_flight_display(self, session: ConversationSession, message: str) -> str:
         """Handle flight search and display"""
-        source_city = session.get_data('source_city')
-        destination_city = session.get_data('destination_city')
-        departure_date = session.get_data('departure_date')
-        adults = session.get_data('adults', 1)
-        children = session.get_data('children', 0)
-        infants = session.get_data('infants', 0)
-        
         # Search for flights
-        flights = self.flight_service.search_flights(
-            origin=source_city['iata'],
-            destination=destination_city['iata'],
-            date=departure_date,
-            adults=adults,
-            children=children,
-            infants=infants
-        )
+        flights = self._search_flights(session.get_search_params())
         
         if not flights:
             return self.whatsapp_service.send_error_message(session.phone_number, 'no_flights')
@@ -243,6 +379,19 @@ I can help you book flights quickly and easily. To get started, just tell me:
         
         return flight_message
     
+    def _search_flights(self, params: SearchParams) -> List[Flight]:
+        """Search flights, reusing an identical search from the last FLIGHT_SEARCH_CACHE_TTL seconds"""
+        now = time.monotonic()
+        entry = self._search_cache.get(params)
+        if entry is not None and now - entry[0] < Config.FLIGHT_SEARCH_CACHE_TTL:
+            return entry[1]
+        
+        # SearchParams is laid out in search_flights argument order
+        flights = self.flight_service.search_flights(*params)
+        
+        self._search_cache.put(params, (now, flights))
+        return flights
+    
     def _handle_flight_selection(self, session: ConversationSession, message: str) -> str:
         """Handle flight selection"""
         selection = self.intent_service.extract_flight_selection(message)
@@ -258,37 +407,18 @@ I can help you book flights quickly and easily. To get started, just tell me:
             
             adults = session.get_data('adults', 1)
             if adults == 1:
-                return f"""✅ *Flight Selected:* {selected_flight.airline} {selected_flight.flight_id}
-
-👤 *Passenger Details Required:*
-Please provide passenger information in this format:
-*Full Name, Date of Birth, Passport Number, Nationality*
-
-*Example:*
-John Doe, 10-May-1990, A1234567, Indian
-
-*Please enter passenger details:*"""
+                return _FLIGHT_SELECTED_TEMPLATE.format(airline=selected_flight.airline,
+                                                        flight_id=selected_flight.flight_id)
             else:
-                return f"""✅ *Flight Selected:* {selected_flight.airline} {selected_flight.flight_id}
-
-👥 *Passenger Details Required ({adults} passengers):*
-Please provide details for passenger 1 in this format:
-*Full Name, Date of Birth, Passport Number, Nationality*
-
-*Example:*
-John Doe, 10-May-1990, A1234567, Indian
-
-*Passenger 1 details:*"""
+                return _FLIGHT_SELECTED_GROUP_TEMPLATE.format(airline=selected_flight.airline,
+                                                              flight_id=selected_flight.flight_id,
+                                                              adults=adults)
         else:
             session.increment_retry()
             if session.get_retry_count() >= self.max_retries:
                 return self._offer_human_support(session)
             
-            return f"""❌ Invalid selection. Please choose a number between 1 and {len(available_flights)}.
-
-*Example:* Type "*1*" to select the first option.
-
-*Which flight would you like to select?*"""
+            return _INVALID_SELECTION_TEMPLATE.format(count=len(available_flights))
     
     def _handle_passenger_details_collection(self, session: ConversationSession, message: str) -> str:
         """Handle passenger details collection"""
@@ -305,46 +435,23 @@ John Doe, 10-May-1990, A1234567, Indian
             if current_passenger_count < adults:
                 # Need more passenger details
                 next_passenger = current_passenger_count + 1
-                return f"""✅ *Passenger {current_passenger_count} details saved!*
-
-👤 *Please provide details for passenger {next_passenger}:*
-*Full Name, Date of Birth, Passport Number, Nationality*
-
-*Passenger {next_passenger} details:*"""
+                return _PASSENGER_SAVED_TEMPLATE.format(saved=current_passenger_count, next=next_passenger)
             else:
                 # All passenger details collected
                 session.reset_retry()
                 session.set_state(ConversationState.COLLECT_SSR)
                 
-                return f"""✅ *All passenger details saved!*
-
-🍽️ *Special Requests (Optional):*
-Do you have any special requests for your flight?
-
-*Examples:*
-• "Vegetarian meal and window seat"
-• "Wheelchair assistance"
-• "Extra baggage"
-• "No special requests"
-
-*Any special requests?*"""
+                return _MSG_SSR_PROMPT
         else:
             session.increment_retry()
             if session.get_retry_count() >= self.max_retries:
                 return self._offer_human_support(session)
             
-            return f"""❌ Invalid format. Please provide passenger details in this format:
-
-*Full Name, Date of Birth, Passport Number, Nationality*
-
-*Example:*
-John Doe, 10-May-1990, A1234567, Indian
-
-*Please try again:*"""
+            return _MSG_PASSENGER_DETAILS_HELP
     
     def _handle_ssr_collection(self, session: ConversationSession, message: str) -> str:
         """Handle special service requests collection"""
-        if self.intent_service.is_negative(message) or 'no special' in message.lower() or 'skip' in message.lower():
+        if self.intent_service.declines_special_requests(message):
             # No special requests
             session.set_data('ssr', [])
         else:
@@ -358,73 +465,42 @@ John Doe, 10-May-1990, A1234567, Indian
     
     def _handle_booking_confirmation(self, session: ConversationSession, message: str) -> str:
         """Handle final booking confirmation"""
-        if self.intent_service.is_affirmative(message) or 'confirm' in message.lower():
+        # 'confirm' and 'cancel' are part of the yes/no vocabulary
+        if self.intent_service.is_affirmative(message):
             return self._process_booking(session)
-        elif self.intent_service.is_negative(message) or 'cancel' in message.lower():
+        elif self.intent_service.is_negative(message):
             session.set_state(ConversationState.COMPLETED)
             return "❌ *Booking Cancelled*\n\nNo worries! Feel free to start a new search anytime. Just say 'book flight' when you're ready. ✈️"
         else:
-            return """Please confirm your booking:
-
-• Type "*yes*" or "*confirm*" to proceed with booking
-• Type "*no*" or "*cancel*" to cancel
-
-*Would you like to proceed?*"""
+            return _MSG_CONFIRM_PROMPT
     
     def _handle_completed_state(self, session: ConversationSession, message: str) -> str:
         """Handle completed state - start new booking"""
         if self.intent_service.detect_flight_booking_intent(message):
             # Start new booking
             session.state = ConversationState.GREETING
-            session.data = {
-                'source_city': None,
-                'destination_city': None,
-                'departure_date': None,
-                'return_date': None,
-                'adults': 1,
-                'children': 0,
-                'infants': 0,
-                'selected_flight': None,
-                'passengers': [],
-                'ssr': [],
-                'pnr': None,
-                'booking_confirmed': False
-            }
+            session.reset_data()
             return self._handle_greeting(session, message)
         else:
-            return """✈️ *How can I help you today?*
-
-• Type "*book flight*" to start a new booking
-• Type "*help*" for assistance
-
-*What would you like to do?*"""
+            return _MSG_COMPLETED_HELP
     
     def _handle_unknown_state(self, session: ConversationSession, message: str) -> str:
         """Handle unknown state"""
-        logger.warning(f"Unknown state: {session.state}")
+        logger.warning("Unknown state: %s", session.state)
         session.set_state(ConversationState.GREETING)
         return "🤔 Something seems off. Let's start fresh. How can I help you book a flight?"
     
     def _determine_next_step(self, session: ConversationSession) -> str:
         """Determine the next step in the conversation flow"""
         # Check what information is missing and move to appropriate state
-        
-        if not session.get_data('source_city'):
-            session.set_state(ConversationState.COLLECT_SOURCE)
-            return "🛫 *Great! Let's book your flight.*\n\n*Which city are you flying from?*"
-        
-        if not session.get_data('destination_city'):
-            session.set_state(ConversationState.COLLECT_DESTINATION)
-            source_city = session.get_data('source_city')
-            return f"🛬 *Flying from {source_city['name']}.*\n\n*Where would you like to go?*"
-        
-        if not session.get_data('departure_date'):
-            session.set_state(ConversationState.COLLECT_DATE)
-            destination_city = session.get_data('destination_city')
-            return f"📅 *Flying to {destination_city['name']}.*\n\n*When would you like to travel?*"
+        data = session.data
+        for key, state, prompt, city_key in _NEXT_STEP_RULES:
+            if not data.get(key):
+                session.set_state(state)
+                return prompt.format(name=data[city_key]['name']) if city_key else prompt
         
         # Check passenger count
-        adults = session.get_data('adults', 0)
+        adults = data.get('adults', 0)
         if adults <= 0:
             session.set_state(ConversationState.COLLECT_PASSENGERS)
             return "👥 *How many passengers will be traveling?*"
@@ -435,13 +511,13 @@ John Doe, 10-May-1990, A1234567, Indian
     
     def _generate_booking_summary(self, session: ConversationSession) -> str:
         """Generate booking summary for confirmation"""
-        source_city = session.get_data('source_city')
-        destination_city = session.get_data('destination_city')
-        departure_date = session.get_data('departure_date')
-        selected_flight = session.get_data('selected_flight')
-        passengers = session.get_data('passengers', [])
-        ssr_requests = session.get_data('ssr', [])
-        adults = session.get_data('adults', 1)
+        data = session.data
+        source_city = data.get('source_city')
+        destination_city = data.get('destination_city')
+        departure_date = data.get('departure_date')
+        selected_flight = data.get('selected_flight')
+        passengers = data.get('passengers', [])
+        ssr_requests = data.get('ssr', [])
         
         # Passenger summary
         if len(passengers) == 1:
@@ -453,31 +529,22 @@ John Doe, 10-May-1990, A1234567, Indian
         # SSR summary
         ssr_summary = ""
         if ssr_requests:
-            ssr_descriptions = []
-            for ssr in ssr_requests:
-                if ssr['type'] == 'meal':
-                    ssr_descriptions.append(f"• {ssr['preference'].title()} meal")
-                elif ssr['type'] == 'seat':
-                    ssr_descriptions.append(f"• {ssr['preference'].replace('_', ' ').title()} seat")
-                else:
-                    ssr_descriptions.append(f"• {ssr['preference'].title()}")
-            ssr_summary = f"\n\n🍽️ *Special Requests:*\n" + "\n".join(ssr_descriptions)
+            ssr_descriptions = [_SSR_FORMATTERS.get(ssr['type'], _format_other_ssr)(ssr)
+                                for ssr in ssr_requests]
+            ssr_summary = "\n\n🍽️ *Special Requests:*\n" + "\n".join(ssr_descriptions)
         
-        return f"""📋 *BOOKING SUMMARY*
-
-✈️ *Flight:* {selected_flight.airline} {selected_flight.flight_id}
-🛫 *Route:* {source_city['name']} → {destination_city['name']}
-📅 *Date:* {departure_date}
-🕐 *Time:* {selected_flight.departure_time} - {selected_flight.arrival_time}
-💰 *Total Price:* ₹{selected_flight.price:,}
-
-{passenger_summary}{ssr_summary}
-
-*Please confirm your booking:*
-• Type "*yes*" or "*confirm*" to proceed
-• Type "*no*" or "*cancel*" to cancel
-
-*Proceed with booking?*"""
+        return _BOOKING_SUMMARY_TEMPLATE.format_map({
+            'airline': selected_flight.airline,
+            'flight_id': selected_flight.flight_id,
+            'source': source_city['name'],
+            'destination': destination_city['name'],
+            'date': departure_date,
+            'departure_time': selected_flight.departure_time,
+            'arrival_time': selected_flight.arrival_time,
+            'price': selected_flight.price,
+            'passenger_summary': passenger_summary,
+            'ssr_summary': ssr_summary
+        })
     
     def _process_booking(self, session: ConversationSession) -> str:
         """Process the actual booking"""
@@ -486,24 +553,18 @@ John Doe, 10-May-1990, A1234567, Indian
             passengers = session.get_data('passengers', [])
             ssr_requests = session.get_data('ssr', [])
             
-            # Create booking
-            booking = self.flight_service.create_booking(
+            # Create the booking, attach special requests and issue the ticket in one call
+            booking = self.flight_service.create_and_confirm_booking(
                 flight=selected_flight,
                 passengers_data=passengers,
                 contact_email="customer@example.com",  # In real implementation, collect this
-                contact_phone=session.phone_number
+                contact_phone=session.phone_number,
+                ssr_requests=ssr_requests
             )
             
             if not booking:
                 return "❌ *Booking Failed*\n\nSorry, there was an issue creating your booking. Please try again or contact support."
             
-            # Add special requests if any
-            if ssr_requests:
-                self.flight_service.add_special_requests(booking.pnr, ssr_requests)
-            
-            # Issue ticket
-            self.flight_service.issue_ticket(booking.pnr)
-            
             # Update session
             session.set_data('pnr', booking.pnr)
             session.set_data('booking_confirmed', True)
@@ -513,29 +574,14 @@ John Doe, 10-May-1990, A1234567, Indian
             return booking.generate_confirmation_message()
             
         except Exception as e:
-            logger.error(f"Error processing booking: {e}")
+            logger.error("Error processing booking: %s", e)
             return "❌ *Booking Failed*\n\nSorry, there was an issue processing your booking. Please try again or contact support."
     
     def _offer_human_support(self, session: ConversationSession) -> str:
         """Offer human support when bot reaches retry limit"""
         session.set_state(ConversationState.COMPLETED)
-        return """🆘 *Need Human Assistance*
-
-I'm having trouble understanding your request. Let me connect you with our support team.
-
-*Your support ticket ID: #12345*
-
-Meanwhile, you can:
-• Try rephrasing your request
-• Type "*help*" for assistance
-• Type "*book flight*" to start over
-
-Our team will contact you shortly! 📞"""
+        return _MSG_HUMAN_SUPPORT
     
     def _get_city_name_by_iata(self, iata_code: str) -> str:
         """Get city name by IATA code"""
-        cities_data = self.intent_service.cities_data
-        for city_key, city_data in cities_data['cities'].items():
-            if city_data['iata'] == iata_code:
-                return city_data['name']
-        return iata_code 
\ No newline at end of file
+        return self._iata_to_name.get(iata_code, iata_code) 
\ No newline at end of file
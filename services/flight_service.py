@@ -1,22 +1,67 @@
-import json
 import os
 import time
-from typing import List, Optional, Dict
+from collections import defaultdict
+from dataclasses import replace
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
-from models.flight_data import Flight, Passenger, SpecialServiceRequest, Booking, BookingManager, SSR_CODES
+import orjson
+from models.flight_data import Flight, Passenger, Booking, BookingManager, get_ssr
 from config.settings import Config
 
 class FlightService:
     def __init__(self):
         self.flights_data = self._load_flights_data()
         self.booking_manager = BookingManager()
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """Index the (static) flight data by ID and route so lookups never scan the list.
+        
+        Each flight is built once as an immutable Flight at its base fare; searches
+        only derive a copy when the passenger mix changes the price.
+        """
+        by_id: Dict[str, Flight] = {}
+        by_route: Dict[Tuple[str, str], List[Flight]] = defaultdict(list)
+        # dicts as ordered sets: each code once, in data file order
+        dests_from: Dict[str, Dict[str, None]] = defaultdict(dict)
+        origins_to: Dict[str, Dict[str, None]] = defaultdict(dict)
+        for flight_data in self.flights_data['flights']:
+            flight = Flight(
+                flight_id=flight_data['flight_id'],
+                airline=flight_data['airline'],
+                origin=flight_data['origin'],
+                destination=flight_data['destination'],
+                departure_time=flight_data['departure_time'],
+                arrival_time=flight_data['arrival_time'],
+                price=flight_data['price'],
+                currency=flight_data['currency'],
+                duration=flight_data['duration'],
+                aircraft=flight_data['aircraft']
+            )
+            by_id.setdefault(flight.flight_id, flight)
+            by_route[flight.origin, flight.destination].append(flight)
+            dests_from[flight.origin][flight.destination] = None
+            origins_to[flight.destination][flight.origin] = None
+        
+        self._by_id = by_id
+        self._by_route = dict(by_route)
+        self._dests_from = {origin: list(dests) for origin, dests in dests_from.items()}
+        self._origins_to = {dest: list(origins) for dest, origins in origins_to.items()}
+        self._price_ranges: Dict[Tuple[str, str], Dict[str, int]] = {}
+        for route, route_flights in self._by_route.items():
+            prices = [flight.price for flight in route_flights]
+            self._price_ranges[route] = {
+                'min_price': min(prices),
+                'max_price': max(prices),
+                'avg_price': sum(prices) // len(prices)
+            }
     
     def _load_flights_data(self) -> Dict:
         """Load flights data from JSON file"""
         try:
             flights_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'dummy_flights.json')
-            with open(flights_file, 'r') as f:
-                return json.load(f)
+            with open(flights_file, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             print("Flights data file not found")
             return {'flights': []}
@@ -30,32 +75,19 @@ class FlightService:
         
         available_flights = []
         
-        for flight_data in self.flights_data['flights']:
-            if (flight_data['origin'] == origin.upper() and 
-                flight_data['destination'] == destination.upper()):
-                
-                flight = Flight(
-                    flight_id=flight_data['flight_id'],
-                    airline=flight_data['airline'],
-                    origin=flight_data['origin'],
-                    destination=flight_data['destination'],
-                    departure_time=flight_data['departure_time'],
-                    arrival_time=flight_data['arrival_time'],
-                    price=flight_data['price'],
-                    currency=flight_data['currency'],
-                    duration=flight_data['duration'],
-                    aircraft=flight_data['aircraft']
-                )
-                available_flights.append(flight)
-        
-        # Calculate total price based on passenger count
-        for flight in available_flights:
+        for flight in self._by_route.get((origin.upper(), destination.upper()), ()):
+            # Calculate total price based on passenger count
             total_price = flight.price * adults
             if children > 0:
                 total_price += flight.price * 0.75 * children  # 25% discount for children
             if infants > 0:
                 total_price += flight.price * 0.1 * infants   # 90% discount for infants
-            flight.price = int(total_price)
+            
+            # Flight is immutable, so a single adult shares the indexed instance
+            total_price = int(total_price)
+            if total_price != flight.price:
+                flight = replace(flight, price=total_price)
+            available_flights.append(flight)
         
         # Sort by price
         available_flights.sort(key=lambda x: x.price)
@@ -64,21 +96,8 @@ class FlightService:
     
     def get_flight_by_id(self, flight_id: str) -> Optional[Flight]:
         """Get flight details by flight ID"""
-        for flight_data in self.flights_data['flights']:
-            if flight_data['flight_id'] == flight_id:
-                return Flight(
-                    flight_id=flight_data['flight_id'],
-                    airline=flight_data['airline'],
-                    origin=flight_data['origin'],
-                    destination=flight_data['destination'],
-                    departure_time=flight_data['departure_time'],
-                    arrival_time=flight_data['arrival_time'],
-                    price=flight_data['price'],
-                    currency=flight_data['currency'],
-                    duration=flight_data['duration'],
-                    aircraft=flight_data['aircraft']
-                )
-        return None
+        # Frozen instances, so callers can share the indexed one without copying
+        return self._by_id.get(flight_id)
     
     def create_booking(self, flight: Flight, passengers_data: List[Dict], 
                       contact_email: str, contact_phone: str) -> Optional[Booking]:
@@ -87,31 +106,61 @@ class FlightService:
             # Simulate API delay
             time.sleep(Config.MOCK_API_DELAY)
             
-            # Convert passenger data to Passenger objects
-            passengers = []
-            for passenger_data in passengers_data:
-                passenger = Passenger(
-                    first_name=passenger_data['first_name'],
-                    last_name=passenger_data['last_name'],
-                    dob=passenger_data['dob'],
-                    passport_number=passenger_data['passport_number'],
-                    nationality=passenger_data['nationality']
-                )
-                passengers.append(passenger)
+            return self._create_booking(flight, passengers_data, contact_email, contact_phone)
             
-            # Create booking
-            booking = self.booking_manager.create_booking(
-                flight=flight,
-                passengers=passengers,
-                contact_email=contact_email,
-                contact_phone=contact_phone
-            )
+        except Exception as e:
+            print(f"Error creating booking: {e}")
+            return None
+    
+    def create_and_confirm_booking(self, flight: Flight, passengers_data: List[Dict],
+                                   contact_email: str, contact_phone: str,
+                                   ssr_requests: Optional[List[Dict]] = None) -> Optional[Booking]:
+        """Create a booking, add its special requests and issue the ticket in one API call"""
+        try:
+            # Simulate API delay (one round trip for the whole batch)
+            time.sleep(Config.MOCK_API_DELAY)
             
-            return booking
+            booking = self._create_booking(flight, passengers_data, contact_email, contact_phone)
             
         except Exception as e:
             print(f"Error creating booking: {e}")
             return None
+        
+        # Special requests are optional, so a bad one must not fail the booking
+        if ssr_requests:
+            try:
+                if not self._add_special_requests(booking.pnr, ssr_requests):
+                    print(f"Could not add special requests to {booking.pnr}")
+            except Exception as e:
+                print(f"Error adding special requests: {e}")
+        
+        if not self.booking_manager.issue_ticket(booking.pnr):
+            print(f"Error issuing ticket for {booking.pnr}")
+            self.booking_manager.remove_booking(booking.pnr)
+            return None
+        return booking
+    
+    def _create_booking(self, flight: Flight, passengers_data: List[Dict],
+                        contact_email: str, contact_phone: str) -> Booking:
+        # Convert passenger data to Passenger objects
+        passengers = []
+        for passenger_data in passengers_data:
+            passenger = Passenger(
+                first_name=passenger_data['first_name'],
+                last_name=passenger_data['last_name'],
+                dob=passenger_data['dob'],
+                passport_number=passenger_data['passport_number'],
+                nationality=passenger_data['nationality']
+            )
+            passengers.append(passenger)
+        
+        # Create booking
+        return self.booking_manager.create_booking(
+            flight=flight,
+            passengers=passengers,
+            contact_email=contact_email,
+            contact_phone=contact_phone
+        )
     
     def add_special_requests(self, pnr: str, ssr_requests: List[Dict]) -> bool:
         """Add special service requests to booking"""
@@ -119,27 +168,22 @@ class FlightService:
             # Simulate API delay
             time.sleep(Config.MOCK_API_DELAY * 0.5)
             
-            ssr_objects = []
-            for ssr_request in ssr_requests:
-                ssr_type = ssr_request['type']
-                preference = ssr_request['preference']
-                
-                # Get SSR code and description
-                if ssr_type in SSR_CODES and preference in SSR_CODES[ssr_type]:
-                    ssr_info = SSR_CODES[ssr_type][preference]
-                    ssr = SpecialServiceRequest(
-                        type=ssr_type.upper(),
-                        code=ssr_info['code'],
-                        description=ssr_info['description']
-                    )
-                    ssr_objects.append(ssr)
-            
-            return self.booking_manager.add_special_requests(pnr, ssr_objects)
+            return self._add_special_requests(pnr, ssr_requests)
             
         except Exception as e:
             print(f"Error adding special requests: {e}")
             return False
     
+    def _add_special_requests(self, pnr: str, ssr_requests: List[Dict]) -> bool:
+        ssr_objects = []
+        for ssr_request in ssr_requests:
+            # Get SSR code and description
+            ssr = get_ssr(ssr_request['type'], ssr_request['preference'])
+            if ssr is not None:
+                ssr_objects.append(ssr)
+        
+        return self.booking_manager.add_special_requests(pnr, ssr_objects)
+    
     def issue_ticket(self, pnr: str) -> bool:
         """Issue ticket for booking"""
         try:
@@ -174,42 +218,21 @@ class FlightService:
     
     def validate_route(self, origin: str, destination: str) -> bool:
         """Check if route exists in our flight data"""
-        for flight_data in self.flights_data['flights']:
-            if (flight_data['origin'] == origin.upper() and 
-                flight_data['destination'] == destination.upper()):
-                return True
-        return False
+        return (origin.upper(), destination.upper()) in self._by_route
     
     def get_available_destinations_from(self, origin: str) -> List[str]:
         """Get list of available destinations from origin"""
-        destinations = set()
-        for flight_data in self.flights_data['flights']:
-            if flight_data['origin'] == origin.upper():
-                destinations.add(flight_data['destination'])
-        return list(destinations)
+        return list(self._dests_from.get(origin.upper(), ()))
     
     def get_available_origins_to(self, destination: str) -> List[str]:
         """Get list of available origins to destination"""
-        origins = set()
-        for flight_data in self.flights_data['flights']:
-            if flight_data['destination'] == destination.upper():
-                origins.add(flight_data['origin'])
-        return list(origins)
+        return list(self._origins_to.get(destination.upper(), ()))
     
     def get_price_range(self, origin: str, destination: str) -> Dict[str, int]:
         """Get price range for a route"""
-        prices = []
-        for flight_data in self.flights_data['flights']:
-            if (flight_data['origin'] == origin.upper() and 
-                flight_data['destination'] == destination.upper()):
-                prices.append(flight_data['price'])
-        
-        if prices:
-            return {
-                'min_price': min(prices),
-                'max_price': max(prices),
-                'avg_price': sum(prices) // len(prices)
-            }
+        price_range = self._price_ranges.get((origin.upper(), destination.upper()))
+        if price_range:
+            return dict(price_range)
         return {'min_price': 0, 'max_price': 0, 'avg_price': 0}
 
 class MockAPIResponse:
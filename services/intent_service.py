@@ -1,14 +1,21 @@
 import re
-import json
 import os
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dateutil.parser import parse as parse_date
 from datetime import datetime, timedelta
-from fuzzywuzzy import fuzz, process
+from rapidfuzz import fuzz, process, utils
+import orjson
 
 class IntentService:
     def __init__(self):
         self.cities_data = self._load_cities_data()
+        # Flat (lowercased name/IATA/alias, city_data) pairs, walked without touching nested dicts
+        self.city_aliases = self._build_city_aliases()
+        self.all_city_names = [name for name, _ in self.city_aliases]
+        self.city_mapping = dict(self.city_aliases)
+        # Pre-processed choices so RapidFuzz only has to process the query
+        self._city_choices = [utils.default_process(name) for name in self.all_city_names]
         self.flight_booking_keywords = [
             'book flight', 'flight booking', 'book a flight', 'reserve flight',
             'travel', 'fly to', 'going to', 'trip to', 'want to fly',
@@ -25,17 +32,54 @@ class IntentService:
             'people': r'(\d+)\s*people',
             'pax': r'(\d+)\s*pax'
         }
+        
+        # Yes/no vocabulary, each list compiled to one case-insensitive alternation so a
+        # check is a single scan of the message (substring matching, as before)
+        affirmative_words = ['yes', 'ok', 'okay', 'sure', 'confirm', 'proceed', 'book it', 'go ahead']
+        negative_words = ['no', 'cancel', 'stop', 'quit', 'exit', 'abort']
+        self._affirmative_re = self._compile_words(affirmative_words)
+        self._negative_re = self._compile_words(negative_words)
+        self._skip_ssr_re = self._compile_words(negative_words + ['skip'])
+    
+    @staticmethod
+    def _compile_words(words: List[str]) -> re.Pattern:
+        return re.compile('|'.join(map(re.escape, words)), re.IGNORECASE)
     
     def _load_cities_data(self) -> Dict:
         """Load cities data from JSON file"""
         try:
             cities_file = os.path.join(os.path.dirname(__file__), '..', 'data', 'cities.json')
-            with open(cities_file, 'r') as f:
-                return json.load(f)
+            with open(cities_file, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             print("Cities data file not found")
             return {'cities': {}}
     
+    def _build_city_aliases(self) -> Tuple[Tuple[str, Dict], ...]:
+        """Lowercase every city name, IATA code and alias once per service"""
+        city_aliases = []
+        
+        for city_key, city_data in self.cities_data['cities'].items():
+            # Add main city name
+            city_aliases.append((city_data['name'].lower(), city_data))
+            
+            # Add IATA code
+            city_aliases.append((city_data['iata'].lower(), city_data))
+            
+            # Add aliases
+            for alias in city_data.get('aliases', []):
+                city_aliases.append((alias.lower(), city_data))
+        
+        return tuple(city_aliases)
+    
+    def _best_city_match(self, text: str) -> Optional[Dict]:
+        """Best city scoring at least 85 (RapidFuzz's C++ scorer), if any"""
+        match = process.extractOne(utils.default_process(text), self._city_choices,
+                                   scorer=fuzz.WRatio, processor=None, score_cutoff=85)
+        if match is None:
+            return None
+        return self.city_mapping[self.all_city_names[match[2]]]
+    
     def detect_flight_booking_intent(self, message: str) -> bool:
         """Detect if message indicates flight booking intent"""
         message_lower = message.lower()
@@ -60,27 +104,7 @@ class IntentService:
         """Extract city names from message using fuzzy matching"""
         cities_found = []
         message_lower = message.lower()
-        
-        # Get all city names and aliases
-        all_city_names = []
-        city_mapping = {}
-        
-        for city_key, city_data in self.cities_data['cities'].items():
-            # Add main city name
-            city_name = city_data['name'].lower()
-            all_city_names.append(city_name)
-            city_mapping[city_name] = city_data
-            
-            # Add IATA code
-            iata = city_data['iata'].lower()
-            all_city_names.append(iata)
-            city_mapping[iata] = city_data
-            
-            # Add aliases
-            for alias in city_data.get('aliases', []):
-                alias_lower = alias.lower()
-                all_city_names.append(alias_lower)
-                city_mapping[alias_lower] = city_data
+        city_mapping = self.city_mapping
         
         # Split message into words
         words = re.findall(r'\b\w+\b', message_lower)
@@ -92,22 +116,18 @@ class IntentService:
                 continue
                 
             # Check single word
-            matches = process.extractBests(word, all_city_names, score_cutoff=85, limit=1)
-            for match, score in matches:
-                city_data = city_mapping[match]
-                if city_data not in cities_found:
-                    cities_found.append(city_data)
+            city_data = self._best_city_match(word)
+            if city_data and city_data not in cities_found:
+                cities_found.append(city_data)
             
             # Check two-word combinations
             if i < len(words) - 1:
                 two_word = f"{word} {words[i+1]}"
                 # Only check two-word combinations if they're meaningful
                 if len(two_word) >= 6:  # Minimum reasonable city name length
-                    matches = process.extractBests(two_word, all_city_names, score_cutoff=85, limit=1)
-                    for match, score in matches:
-                        city_data = city_mapping[match]
-                        if city_data not in cities_found:
-                            cities_found.append(city_data)
+                    city_data = self._best_city_match(two_word)
+                    if city_data and city_data not in cities_found:
+                        cities_found.append(city_data)
         
         # Also check for exact IATA code matches (3 letters)
         iata_matches = re.findall(r'\b[A-Z]{3}\b', message.upper())
@@ -336,14 +356,17 @@ class IntentService:
     
     def is_affirmative(self, message: str) -> bool:
         """Check if message is affirmative (yes, ok, etc.)"""
-        affirmative_words = ['yes', 'ok', 'okay', 'sure', 'confirm', 'proceed', 'book it', 'go ahead']
-        message_lower = message.lower().strip()
-        
-        return any(word in message_lower for word in affirmative_words)
+        return self._affirmative_re.search(message) is not None
     
     def is_negative(self, message: str) -> bool:
         """Check if message is negative (no, cancel, etc.)"""
-        negative_words = ['no', 'cancel', 'stop', 'quit', 'exit', 'abort']
-        message_lower = message.lower().strip()
-        
-        return any(word in message_lower for word in negative_words) 
\ No newline at end of file
+        return self._negative_re.search(message) is not None
+    
+    def declines_special_requests(self, message: str) -> bool:
+        """Check if message turns down special requests (no, skip, 'no special', etc.)"""
+        return self._skip_ssr_re.search(message) is not None
+
+@lru_cache(maxsize=1)
+def get_intent_service() -> IntentService:
+    """Shared IntentService, so the cities file and index are loaded once per process"""
+    return IntentService()
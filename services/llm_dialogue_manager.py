@@ -1,10 +1,11 @@
 import logging
+from functools import lru_cache
 from typing import Dict, Optional
 from models.conversation import ConversationState, ConversationSession
 from services.llm_service import LLMService
 from services.flight_service import FlightService
 from services.whatsapp_service import WhatsAppService
-from services.intent_service import IntentService
+from services.intent_service import get_intent_service
 from datetime import datetime
 from models.ticket_storage import ticket_storage
 
@@ -15,7 +16,7 @@ class LLMDialogueManager:
         self.llm_service = LLMService()
         self.flight_service = FlightService()
         self.whatsapp_service = whatsapp_service
-        self.intent_service = IntentService()  # Keep for city/date extraction
+        self.intent_service = get_intent_service()  # Keep for city/date extraction
         self.max_retries = 3
         
     def process_message(self, session: ConversationSession, message: str) -> str:
@@ -315,7 +316,7 @@ John Doe, 10-May-1990, A1234567, Indian
     
     def _handle_ssr_collection(self, session: ConversationSession, message: str) -> str:
         """Handle special service requests collection"""
-        if self.intent_service.is_negative(message) or 'no special' in message.lower() or 'skip' in message.lower():
+        if self.intent_service.declines_special_requests(message):
             # No special requests
             session.set_data('ssr', [])
         else:
@@ -329,9 +330,10 @@ John Doe, 10-May-1990, A1234567, Indian
     
     def _handle_booking_confirmation(self, session: ConversationSession, message: str) -> str:
         """Handle final booking confirmation"""
-        if self.intent_service.is_affirmative(message) or 'confirm' in message.lower():
+        # 'confirm' and 'cancel' are part of the yes/no vocabulary
+        if self.intent_service.is_affirmative(message):
             return self._process_booking(session)
-        elif self.intent_service.is_negative(message) or 'cancel' in message.lower():
+        elif self.intent_service.is_negative(message):
             session.set_state(ConversationState.COMPLETED)
             return "❌ *Booking Cancelled*\n\nNo worries! Feel free to start a new search anytime. Just tell me about your travel plans! ✈️"
         else:
@@ -365,20 +367,7 @@ John Doe, 10-May-1990, A1234567, Indian
         if is_new_booking_request:
             # User explicitly wants a new booking, reset session
             session.state = ConversationState.GREETING
-            session.data = {
-                'source_city': None,
-                'destination_city': None,
-                'departure_date': None,
-                'return_date': None,
-                'adults': 1,
-                'children': 0,
-                'infants': 0,
-                'selected_flight': None,
-                'passengers': [],
-                'ssr': [],
-                'pnr': None,
-                'booking_confirmed': False
-            }
+            session.reset_data()
             return self._handle_with_llm(session, message)
         
         # 🆕 ENHANCED: Fallback for ticket-related queries that weren't detected
@@ -478,24 +467,18 @@ Your previous booking is confirmed. What would you like to do next?
             passengers = session.get_data('passengers', [])
             ssr_requests = session.get_data('ssr', [])
             
-            # Create booking
-            booking = self.flight_service.create_booking(
+            # Create the booking, attach special requests and issue the ticket in one call
+            booking = self.flight_service.create_and_confirm_booking(
                 flight=selected_flight,
                 passengers_data=passengers,
                 contact_email="customer@example.com",  # In real implementation, collect this
-                contact_phone=session.phone_number
+                contact_phone=session.phone_number,
+                ssr_requests=ssr_requests
             )
             
             if not booking:
                 return "❌ *Booking Failed*\n\nSorry, there was an issue creating your booking. Please try again or contact support."
             
-            # Add special requests if any
-            if ssr_requests:
-                self.flight_service.add_special_requests(booking.pnr, ssr_requests)
-            
-            # Issue ticket
-            self.flight_service.issue_ticket(booking.pnr)
-            
             # Update session
             session.set_data('pnr', booking.pnr)
             session.set_data('booking_confirmed', True)
@@ -510,7 +493,12 @@ Your previous booking is confirmed. What would you like to do next?
     
     def _detect_ticket_action(self, message: str) -> str:
         """Detect if user wants to perform actions related to their uploaded ticket"""
-        message_lower = message.lower().strip()
+        return self._classify_ticket_action(message.lower().strip())
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _classify_ticket_action(message_lower: str) -> str:
+        """Map a normalized message to a ticket action (pure, so results are cached)"""
         
         # 🆕 ENHANCED: Much more comprehensive price comparison detection
         price_comparison_phrases = [
@@ -585,8 +573,7 @@ Your previous booking is confirmed. What would you like to do next?
                 return "❌ Missing flight details. Please upload a clearer ticket."
             
             # Set up booking search using airport codes
-            from services.intent_service import IntentService
-            intent_service = IntentService()
+            intent_service = self.intent_service
             
             # Try to find city data for origin and destination
             origin_cities = intent_service.extract_cities(origin)
@@ -1,8 +1,10 @@
 import json
 import logging
+from datetime import date
 from typing import Dict, Optional, List
 import google.generativeai as genai
 from config.settings import Config
+from utils.lru import LRUCache
 
 logger = logging.getLogger(__name__)
 
@@ -11,12 +13,53 @@ class LLMService:
         # Configure Google AI
         genai.configure(api_key=Config.GOOGLE_API_KEY)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # Short messages ("hi", "yes", "Dubai") repeat a lot; reuse their raw analysis,
+        # keyed by (normalized message, booking data, today's date), least recently used evicted first
+        self._analysis_cache = LRUCache(Config.LLM_CACHE_SIZE)
         
     def analyze_flight_booking_message(self, message: str, current_data: Dict) -> Dict:
         """
         Use Google Gemini to analyze user message and extract flight booking information
         """
         
+        try:
+            normalized = message.lower().strip()
+            data_key = json.dumps(current_data, sort_keys=True)
+            cache_key = None
+            response_text = None
+            if len(normalized) <= Config.LLM_CACHE_MAX_MESSAGE_LENGTH:
+                # Gemini resolves relative dates ("tomorrow") itself, so entries only hold for the day
+                cache_key = (normalized, data_key, date.today().isoformat())
+                response_text = self._analysis_cache.get(cache_key)
+            
+            if response_text is None:
+                # Gemini always sees the user's original text; the lowercased form is only a key
+                response_text = self._request_analysis(message, data_key)
+                result = json.loads(response_text)
+                # Never reuse an extracted travel date, even on the same day
+                if cache_key is not None and not (result.get('extracted_data') or {}).get('departure_date'):
+                    self._analysis_cache.put(cache_key, response_text)
+            else:
+                result = json.loads(response_text)
+            logger.info(f"Gemini Analysis: {result}")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Gemini analysis error: {e}")
+            return {
+                "intent": "flight_booking",
+                "extracted_data": {},
+                "confidence": 0.5,
+                "next_question": "I'd like to help you book a flight. Which city would you like to fly from?",
+                "reasoning": "Error in Gemini processing, using fallback"
+            }
+    
+    def _request_analysis(self, message: str, current_data_json: str) -> str:
+        """Ask Gemini to analyze a message and return its raw JSON text.
+        
+        Errors propagate so that failed calls are never cached.
+        """
+        
         system_prompt = """You are an intelligent multilingual flight booking assistant that understands casual WhatsApp language, typos, abbreviations, and multiple languages.
 
 LANGUAGE UNDERSTANDING:
@@ -76,7 +119,7 @@ Respond ONLY with valid JSON:
 }"""
 
         user_prompt = f"""
-Current booking data: {json.dumps(current_data)}
+Current booking data: {current_data_json}
 User message: "{message}"
 
 Analyze this message and determine what flight booking information can be extracted and what should be asked next.
@@ -84,31 +127,20 @@ Analyze this message and determine what flight booking information can be extrac
 {system_prompt}
 """
 
-        try:
-            response = self.model.generate_content(user_prompt)
-            
-            # Extract JSON from response
-            response_text = response.text.strip()
-            
-            # Sometimes Gemini wraps JSON in markdown code blocks
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3].strip()
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3].strip()
-                
-            result = json.loads(response_text)
-            logger.info(f"Gemini Analysis: {result}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"Gemini analysis error: {e}")
-            return {
-                "intent": "flight_booking",
-                "extracted_data": {},
-                "confidence": 0.5,
-                "next_question": "I'd like to help you book a flight. Which city would you like to fly from?",
-                "reasoning": "Error in Gemini processing, using fallback"
-            }
+        response = self.model.generate_content(user_prompt)
+        
+        # Extract JSON from response
+        response_text = response.text.strip()
+        
+        # Sometimes Gemini wraps JSON in markdown code blocks
+        if response_text.startswith('```json'):
+            response_text = response_text[7:-3].strip()
+        elif response_text.startswith('```'):
+            response_text = response_text[3:-3].strip()
+        
+        # Validate before the text is cached
+        json.loads(response_text)
+        return response_text
     
     def generate_response(self, analysis: Dict, session_data: Dict) -> str:
         """Generate appropriate response based on Gemini analysis"""
@@ -1,7 +1,10 @@
+import atexit
+import io
 import logging
-import tempfile
 import os
-from typing import Dict, Optional, List
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Optional, List, Union
 import PyPDF2
 import pdfplumber
 import google.generativeai as genai
@@ -10,55 +13,77 @@ from config.settings import Config
 logger = logging.getLogger(__name__)
 
 class TicketParserService:
-    def __init__(self):
+    def __init__(self, pdf_workers: int = 0):
         # Configure Google AI
         genai.configure(api_key=Config.GOOGLE_API_KEY)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # Optional process pool so CPU-bound text extraction does not hold the GIL here
+        self.pdf_workers = pdf_workers
+        self._pdf_pool: Optional[ProcessPoolExecutor] = None
+        self._pdf_pool_pid: Optional[int] = None
+        self._pdf_pool_lock = threading.Lock()
+    
+    @property
+    def pdf_pool(self) -> Optional[ProcessPoolExecutor]:
+        """This process's extraction pool, created on first use (a pool must never be
+        used across fork, e.g. when gunicorn preloads the app, so each worker gets its own)"""
+        if self.pdf_workers <= 0:
+            return None
+        with self._pdf_pool_lock:
+            if self._pdf_pool is None or self._pdf_pool_pid != os.getpid():
+                self._pdf_pool = ProcessPoolExecutor(max_workers=self.pdf_workers)
+                self._pdf_pool_pid = os.getpid()
+                atexit.register(self._pdf_pool.shutdown, wait=False)
+            return self._pdf_pool
         
-    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
+    @staticmethod
+    def _as_stream(pdf_content: Union[bytes, BinaryIO]) -> BinaryIO:
+        """Wrap raw bytes so both parsers can read the PDF in place"""
+        if isinstance(pdf_content, (bytes, bytearray)):
+            return io.BytesIO(pdf_content)
+        return pdf_content
+    
+    @staticmethod
+    def extract_text_from_pdf(pdf_content: Union[bytes, BinaryIO]) -> str:
         """Extract text from PDF using multiple methods for better accuracy"""
         extracted_text = ""
         
         try:
+            pdf_stream = TicketParserService._as_stream(pdf_content)
+            
             # Method 1: Using pdfplumber (better for complex layouts)
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                temp_file.write(pdf_content)
-                temp_file.flush()
-                
+            try:
+                pdf_stream.seek(0)
+                with pdfplumber.open(pdf_stream) as pdf:
+                    for page in pdf.pages:
+                        text = page.extract_text()
+                        if text:
+                            extracted_text += text + "\n"
+            except Exception as e:
+                logger.warning(f"pdfplumber extraction failed: {e}")
+            
+            # Method 2: Fallback to PyPDF2 if pdfplumber fails
+            if not extracted_text.strip():
                 try:
-                    with pdfplumber.open(temp_file.name) as pdf:
-                        for page in pdf.pages:
-                            text = page.extract_text()
-                            if text:
-                                extracted_text += text + "\n"
+                    pdf_stream.seek(0)
+                    pdf_reader = PyPDF2.PdfReader(pdf_stream)
+                    for page in pdf_reader.pages:
+                        text = page.extract_text()
+                        if text:
+                            extracted_text += text + "\n"
                 except Exception as e:
-                    logger.warning(f"pdfplumber extraction failed: {e}")
-                
-                # Method 2: Fallback to PyPDF2 if pdfplumber fails
-                if not extracted_text.strip():
-                    try:
-                        with open(temp_file.name, 'rb') as pdf_file:
-                            pdf_reader = PyPDF2.PdfReader(pdf_file)
-                            for page in pdf_reader.pages:
-                                text = page.extract_text()
-                                if text:
-                                    extracted_text += text + "\n"
-                    except Exception as e:
-                        logger.warning(f"PyPDF2 extraction failed: {e}")
-                
-                # Clean up temp file
-                os.unlink(temp_file.name)
+                    logger.warning(f"PyPDF2 extraction failed: {e}")
                 
         except Exception as e:
             logger.error(f"PDF text extraction failed: {e}")
             
         return extracted_text.strip()
     
-    def parse_flight_ticket(self, pdf_content: bytes) -> Dict:
+    def parse_flight_ticket(self, pdf_content: Union[bytes, BinaryIO]) -> Dict:
         """Parse flight ticket and extract detailed information using LLM"""
         
         # Extract text from PDF
-        ticket_text = self.extract_text_from_pdf(pdf_content)
+        ticket_text = self._extract_text(pdf_content)
         
         if not ticket_text:
             return {
@@ -69,6 +94,24 @@ class TicketParserService:
         # Use LLM to parse ticket information
         return self._analyze_ticket_with_llm(ticket_text)
     
+    def _extract_text(self, pdf_content: Union[bytes, BinaryIO]) -> str:
+        """Extract text inline, or in the process pool when one is configured"""
+        pdf_pool = self.pdf_pool
+        if pdf_pool is None:
+            return self.extract_text_from_pdf(pdf_content)
+        
+        # Only bytes can be pickled across to the worker process
+        pdf_stream = self._as_stream(pdf_content)
+        pdf_stream.seek(0)
+        pdf_bytes = pdf_stream.read()
+        
+        try:
+            future = pdf_pool.submit(TicketParserService.extract_text_from_pdf, pdf_bytes)
+            return future.result(timeout=Config.PDF_PARSE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"PDF text extraction in worker failed: {e}")
+            return ""
+    
     def _analyze_ticket_with_llm(self, ticket_text: str) -> Dict:
         """Use Google Gemini to analyze and extract flight information"""
         
@@ -285,16 +328,18 @@ If parsing fails or ticket format is unrecognizable, respond with:
         
         return message
     
-    def validate_pdf_file(self, file_content: bytes) -> bool:
+    def validate_pdf_file(self, file_content: Union[bytes, BinaryIO]) -> bool:
         """Validate if the uploaded file is a valid PDF"""
         try:
+            pdf_stream = self._as_stream(file_content)
+            
             # Check PDF magic number
-            if not file_content.startswith(b'%PDF-'):
+            pdf_stream.seek(0)
+            if pdf_stream.read(5) != b'%PDF-':
                 return False
             
             # Try to open with PyPDF2
-            import io
-            pdf_stream = io.BytesIO(file_content)
+            pdf_stream.seek(0)
             PyPDF2.PdfReader(pdf_stream)
             return True
             
@@ -1,20 +1,43 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import logging
-from typing import Dict, List, Optional
+import shutil
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, List, Optional
 from config.settings import Config
 import os
 
 logger = logging.getLogger(__name__)
 
+def create_http_session() -> requests.Session:
+    """Create a pooled HTTP session so TCP/TLS connections to Graph API are reused"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                          pool_maxsize=Config.HTTP_POOL_MAXSIZE,
+                          pool_block=False)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 class WhatsAppService:
-    def __init__(self):
-        self.api_url = Config.get_whatsapp_api_url()
+    def __init__(self, http_session: Optional[requests.Session] = None):
+        self.api_url = Config.WHATSAPP_API_URL
         self.access_token = Config.WHATSAPP_TOKEN
         self.headers = {
             'Authorization': f'Bearer {self.access_token}',
             'Content-Type': 'application/json'
         }
+        # One connection pool shared by every outbound WhatsApp call
+        self.http = http_session or create_http_session()
+        # Lets independent sends overlap with other work or with each other
+        self._send_pool = ThreadPoolExecutor(max_workers=Config.SEND_WORKER_THREADS,
+                                             thread_name_prefix='whatsapp-send')
+    
+    def send_in_background(self, send_method: Callable[..., bool], *args) -> Future:
+        """Start a send without waiting for it; call .result() before sending
+        anything else to the same recipient so messages stay in order"""
+        return self._send_pool.submit(send_method, *args)
     
     def send_text_message(self, phone_number: str, message: str) -> bool:
         """Send a text message via WhatsApp"""
@@ -28,10 +51,11 @@ class WhatsAppService:
                 }
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_url,
                 headers=self.headers,
-                data=json.dumps(payload)
+                json=payload,
+                timeout=Config.HTTP_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -72,10 +96,11 @@ class WhatsAppService:
                 }
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_url,
                 headers=self.headers,
-                data=json.dumps(payload)
+                json=payload,
+                timeout=Config.HTTP_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -115,10 +140,11 @@ class WhatsAppService:
                 }
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_url,
                 headers=self.headers,
-                data=json.dumps(payload)
+                json=payload,
+                timeout=Config.HTTP_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -282,10 +308,11 @@ class WhatsAppService:
                 }
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_url,
                 headers=self.headers,
-                data=json.dumps(payload)
+                json=payload,
+                timeout=Config.HTTP_TIMEOUT
             )
             
             return response.status_code == 200
@@ -322,14 +349,19 @@ I'm here to help you book flights quickly and easily. Just tell me where you wan
             'invalid_date': "📅 Invalid date. Please provide a future date.",
             'passenger_limit': "👥 Passenger limit exceeded. Maximum 9 passengers allowed.",
             'invalid_pdf': "📄 Invalid PDF file. Please upload a valid flight ticket in PDF format.",
-            'pdf_parsing_failed': "❌ Unable to read your ticket. Please try uploading a clearer PDF file."
+            'pdf_parsing_failed': "❌ Unable to read your ticket. Please try uploading a clearer PDF file.",
+            'session_busy': "⏳ I'm still working on your previous message. Please send this one again in a moment."
         }
         
         message = error_messages.get(error_type, error_messages['general'])
         return self.send_text_message(phone_number, message)
     
-    def download_media_file(self, media_id: str) -> Optional[bytes]:
-        """Download media file from WhatsApp by media ID"""
+    def download_media_file(self, media_id: str) -> Optional[BinaryIO]:
+        """Download media file from WhatsApp by media ID.
+        
+        The body is streamed into a spooled temporary file (kept in memory
+        up to Config.MEDIA_SPOOL_MAX_SIZE) which the caller must close.
+        """
         try:
             # Get media URL
             media_url_endpoint = f"https://graph.facebook.com/v18.0/{media_id}"
@@ -339,7 +371,7 @@ I'm here to help you book flights quickly and easily. Just tell me where you wan
             }
             
             # Get media URL
-            response = requests.get(media_url_endpoint, headers=headers)
+            response = self.http.get(media_url_endpoint, headers=headers, timeout=Config.HTTP_TIMEOUT)
             
             if response.status_code != 200:
                 logger.error(f"Failed to get media URL: {response.status_code} - {response.text}")
@@ -353,14 +385,19 @@ I'm here to help you book flights quickly and easily. Just tell me where you wan
                 return None
             
             # Download the actual file
-            download_response = requests.get(media_download_url, headers=headers)
+            with self.http.get(media_download_url, headers=headers, timeout=Config.MEDIA_HTTP_TIMEOUT,
+                               stream=True) as download_response:
+                if download_response.status_code != 200:
+                    logger.error(f"Failed to download media: {download_response.status_code}")
+                    return None
+                
+                media_file = tempfile.SpooledTemporaryFile(max_size=Config.MEDIA_SPOOL_MAX_SIZE)
+                download_response.raw.decode_content = True
+                shutil.copyfileobj(download_response.raw, media_file, 64 * 1024)
+                media_file.seek(0)
             
-            if download_response.status_code == 200:
-                logger.info(f"Successfully downloaded media file: {media_id}")
-                return download_response.content
-            else:
-                logger.error(f"Failed to download media: {download_response.status_code}")
-                return None
+            logger.info(f"Successfully downloaded media file: {media_id}")
+            return media_file
                 
         except Exception as e:
             logger.error(f"Error downloading media file: {e}")
@@ -406,10 +443,11 @@ I'll extract your flight details and compare prices with our system! ✈️"""
                 }
             }
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_url,
                 headers=self.headers,
-                data=json.dumps(payload)
+                json=payload,
+                timeout=Config.HTTP_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -445,7 +483,8 @@ I'll extract your flight details and compare prices with our system! ✈️"""
                     'messaging_product': 'whatsapp'
                 }
                 
-                response = requests.post(upload_url, headers=headers, files=files, data=data)
+                response = self.http.post(upload_url, headers=headers, files=files, data=data,
+                                         timeout=Config.MEDIA_HTTP_TIMEOUT)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -33,7 +33,7 @@ def test_pdf_booking_flow():
     session = session_manager.get_session(phone_number)
     response = dialogue_manager.process_message(session, "hi")
     print(f"📱 Bot responds: {response[:100]}...")
-    print(f"🔧 Session state: {session.state.value}")
+    print(f"🔧 Session state: {session.state.label}")
     print("-" * 50)
     
     # Step 2: Simulate PDF ticket upload and analysis (mock parsed ticket data)
@@ -94,7 +94,7 @@ def test_pdf_booking_flow():
     response = dialogue_manager.process_message(session, "book with new price")
     print(f"📱 Bot responds:")
     print(response)
-    print(f"🔧 Session state: {session.state.value}")
+    print(f"🔧 Session state: {session.state.label}")
     print("-" * 50)
     
     # Step 4: User provides office ID
@@ -103,7 +103,7 @@ def test_pdf_booking_flow():
     response = dialogue_manager.process_message(session, office_id)
     print(f"📱 Bot responds:")
     print(response)
-    print(f"🔧 Session state: {session.state.value}")
+    print(f"🔧 Session state: {session.state.label}")
     print("-" * 50)
     
     # Step 5: Check if PDF was generated
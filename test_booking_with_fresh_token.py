@@ -109,7 +109,7 @@ def test_booking_with_fresh_token():
     print("\n🧪 Step 1: User requests booking")
     response1 = dialogue_manager.process_message(session, "book with new price")
     print(f"📱 Bot response: {response1[:100]}...")
-    print(f"🔧 State: {session.state.value}")
+    print(f"🔧 State: {session.state.label}")
     
     # Test office ID
     print("\n🧪 Step 2: User provides office ID")
@@ -118,7 +118,7 @@ def test_booking_with_fresh_token():
     
     print(f"📱 Bot response:")
     print(response2)
-    print(f"🔧 Final state: {session.state.value}")
+    print(f"🔧 Final state: {session.state.label}")
     
     # Check if booking was successful
     new_booking = session.get_data('new_booking')
@@ -45,7 +45,7 @@ def test_complete_booking_flow():
         
         print(f"📱 Bot responds:")
         print(response)
-        print(f"🔧 Session state: {session.state.value}")
+        print(f"🔧 Session state: {session.state.label}")
         print("-" * 50)
     
     print("✅ Test completed!")
@@ -0,0 +1,42 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+class LRUCache:
+    """Thread-safe bounded cache; the least recently used entry is evicted first"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value (marking it recently used) or None"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the oldest entry once maxsize is exceeded"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable):
+        """Drop an entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def discard_where(self, predicate: Callable[[Any], bool]):
+        """Drop every entry whose value matches predicate, in one locked pass"""
+        with self._lock:
+            stale = [key for key, value in self._data.items() if predicate(value)]
+            for key in stale:
+                del self._data[key]
+    
+    def __len__(self) -> int:
+        return len(self._data)